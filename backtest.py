@@ -0,0 +1,175 @@
+"""Backtest - Replays a trader's stored history against a grid of follow settings with NumPy
+
+The trader's trades and the prices seen in the same markets (every stored
+trade plus filled copy orders) are loaded once into arrays. Each copy is
+priced at the latest price `delay` seconds after the trader's fill and
+marked at the latest price at the end of the period. calculate_copy_size
+and check_slippage are then applied to every combination of copy
+percentage, max trade size and max slippage at once, so the cost of a
+grid is a few matrix products per chunk of trades rather than a replay
+per combination.
+"""
+import numpy as np
+from datetime import timezone
+from sqlalchemy import select, func, cast, Float
+from models import Trade, CopyOrder
+
+# Array elements per block of settings, bounding memory whatever the history length
+CHUNK_ELEMENTS = 4_000_000
+
+
+def parse_grid(spec):
+    """'1,5,10' lists values; 'start:stop:count' spaces count values evenly from start to stop"""
+    if ':' in spec:
+        start, stop, count = spec.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(value) for value in spec.split(',')])
+
+
+def _epoch(column):
+    # Converted by the database, which is far cheaper than building a datetime per row
+    return cast(func.extract('epoch', column), Float)
+
+
+def _ms(seconds):
+    return (np.array(seconds, dtype=float) * 1000).astype(np.int64)
+
+
+def as_of(snap_market, snap_time, snap_price, market, at):
+    """Price of the latest snapshot in the same market at or before each time; NaN where there is none"""
+    base = min(snap_time.min(), at.min())
+    span = max(snap_time.max(), at.max()) - base + 1
+    snap_key = snap_market * span + (snap_time - base)
+    order = np.argsort(snap_key, kind='stable')
+    snap_key, snap_price = snap_key[order], snap_price[order]
+
+    index = np.searchsorted(snap_key, market * span + (at - base), side='right') - 1
+    found = index >= 0
+    found[found] = snap_key[index[found]] // span == market[found]
+    prices = np.full(len(at), np.nan)
+    prices[found] = snap_price[index[found]]
+    return prices
+
+
+class History:
+    """A trader's fills as arrays, with the price each copy would have got and the closing mark"""
+
+    def __init__(self, day, side, size, price, copy_price, mark):
+        self.day = day
+        self.side = side
+        self.size = size
+        self.price = price
+        self.copy_price = copy_price
+        self.mark = mark
+
+    def __len__(self):
+        return len(self.size)
+
+
+def load_history(db, trader_address, start=None, end=None, delay=2.0):
+    """Load the trader's trades between start and end (naive UTC datetimes) into a History"""
+    trade_filter = [Trade.trader_address == trader_address.lower(), Trade.price > 0]
+    if start:
+        trade_filter.append(Trade.timestamp >= start)
+    if end:
+        trade_filter.append(Trade.timestamp <= end)
+
+    conn = db.connection()
+    trades = conn.execute(
+        select(Trade.market_id, Trade.side, Trade.size, Trade.price, _epoch(Trade.timestamp))
+        .where(*trade_filter).order_by(Trade.timestamp)
+    ).all()
+    if not trades:
+        return None
+    markets, sides, sizes, prices, timestamps = zip(*trades)
+
+    # Every price seen in those markets: stored trades of any trader and our own fills
+    traded = select(Trade.market_id).where(*trade_filter).distinct()
+    snapshot_filter = [Trade.market_id.in_(traded)]
+    if end:
+        snapshot_filter.append(Trade.timestamp <= end)
+    snapshots = conn.execute(
+        select(Trade.market_id, _epoch(Trade.timestamp), Trade.price).where(*snapshot_filter, Trade.price > 0)
+    ).all() + conn.execute(
+        select(Trade.market_id, _epoch(CopyOrder.filled_at), CopyOrder.filled_price)
+        .join(Trade, CopyOrder.original_trade_id == Trade.id)
+        .where(*snapshot_filter, CopyOrder.status == 'filled', CopyOrder.filled_at.is_not(None), CopyOrder.filled_price > 0)
+    ).all()
+    snap_markets, snap_times, snap_prices = zip(*snapshots)
+
+    codes = {}
+    market = np.array([codes.setdefault(m, len(codes)) for m in markets], dtype=np.int64)
+    snap_market = np.array([codes.setdefault(m, len(codes)) for m in snap_markets], dtype=np.int64)
+    snap_time = _ms(snap_times)
+    snap_price = np.array(snap_prices, dtype=float)
+    at = _ms(timestamps)
+    closing = np.full(len(at), _ms(end.replace(tzinfo=timezone.utc).timestamp()) if end else snap_time.max())
+
+    # The trader's own fill is a snapshot at or before `at`, so every copy gets a price
+    return History(
+        day=at // 86_400_000,
+        side=np.where(np.array(sides) == 'SELL', -1.0, 1.0),
+        size=np.array(sizes, dtype=float),
+        price=np.array(prices, dtype=float),
+        copy_price=as_of(snap_market, snap_time, snap_price, market, at + int(delay * 1000)),
+        mark=as_of(snap_market, snap_time, snap_price, market, closing)
+    )
+
+
+def run_grid(history, copy_pcts, max_trades, slippages):
+    """Replay the history for every (copy %, max trade USD, max slippage %) combination.
+
+    Returns a dict of arrays shaped (copy %, max trade, slippage): copies
+    placed, fill rate (copies per trader fill), volume, capital (peak net
+    cash outlay at the end of any day) and P&L marked at the closing prices.
+    """
+    copy_pcts, max_trades, slippages = (np.asarray(v, dtype=float) for v in (copy_pcts, max_trades, slippages))
+    column_pct = np.repeat(copy_pcts, len(max_trades))
+    column_max = np.tile(max_trades, len(copy_pcts))
+
+    # Same test as check_slippage. A fill is accepted by every threshold from its bin
+    # on (bin len(slippages): by none), so per-threshold totals are cumulative sums over bins
+    by_threshold = np.argsort(slippages)
+    slippage = np.abs(history.copy_price - history.price) / history.price * 100
+    bins = np.searchsorted(slippages[by_threshold], slippage, side='left')
+    days = history.day - history.day.min()
+    day_count = int(days.max()) + 1
+    group = bins * day_count + days
+    order = np.argsort(group, kind='stable')
+    groups, starts = np.unique(group[order], return_index=True)
+
+    size, price = history.size[order, None], history.price[order, None]
+    copy_price, side = history.copy_price[order, None], history.side[order, None]
+    gain = side * (history.mark[order, None] - copy_price)
+    bin_count = len(slippages) + 1
+
+    columns = len(column_pct)
+    block = max(1, min(CHUNK_ELEMENTS // len(history), CHUNK_ELEMENTS // (bin_count * day_count)))
+    totals = {name: np.zeros((bin_count, columns)) for name in ('copies', 'volume', 'pnl')}
+    peak = np.zeros((bin_count, columns))
+
+    for begin in range(0, columns, block):
+        part = slice(begin, begin + block)
+
+        # calculate_copy_size: a share of the trader's size, capped at max_trade_usd at the trader's price
+        copy_size = np.round(np.minimum(size * column_pct[None, part] / 100.0, column_max[None, part] / price), 2)
+
+        group_bins = groups // day_count
+        for name, values in (('copies', copy_size > 0), ('volume', copy_size * copy_price), ('pnl', copy_size * gain)):
+            np.add.at(totals[name][:, part], group_bins, np.add.reduceat(values.astype(float), starts, axis=0))
+
+        # Net cash out by day (buys pay the copy price, sells receive it), accumulated over bins then days
+        flows = np.zeros((bin_count * day_count, copy_size.shape[1]))
+        flows[groups] = np.add.reduceat(copy_size * side * copy_price, starts, axis=0)
+        outlay = flows.reshape(bin_count, day_count, -1).cumsum(axis=0).cumsum(axis=1)
+        peak[:, part] = np.maximum(outlay.max(axis=1), 0.0)
+
+    # Back to the caller's threshold order, dropping the bin no threshold accepts
+    restore = np.argsort(by_threshold)
+    shape = (len(copy_pcts), len(max_trades), len(slippages))
+    result = {
+        name: values.cumsum(axis=0)[:-1][restore].T.reshape(shape) for name, values in totals.items()
+    }
+    result['capital'] = peak[:-1][restore].T.reshape(shape)
+    result['fill_rate'] = result['copies'] / len(history)
+    return result
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,6 +11,71 @@ GAMMA_API_URL = os.getenv('GAMMA_API_URL', 'https://gamma-api.polymarket.com')
 DATA_API_URL = os.getenv('DATA_API_URL', 'https://data-api.polymarket.com')
 
 WS_URL = os.getenv('WS_URL', 'wss://ws-subscriptions-clob.polymarket.com/ws')
+ACTIVITY_WS_URL = os.getenv('ACTIVITY_WS_URL', 'wss://ws-live-data.polymarket.com')
 POLYGON_RPC = os.getenv('POLYGON_RPC', 'https://polygon-rpc.com')
 WATCHER_POLL_INTERVAL = int(os.getenv('WATCHER_POLL_INTERVAL', '10'))
-EXECUTOR_POLL_INTERVAL = int(os.getenv('EXECUTOR_POLL_INTERVAL', '5'))
\ No newline at end of file
+EXECUTOR_POLL_INTERVAL = int(os.getenv('EXECUTOR_POLL_INTERVAL', '5'))
+
+WATCHER_MODE = os.getenv('WATCHER_MODE', 'sync')  # sync | async | stream
+WATCHER_CONCURRENCY = int(os.getenv('WATCHER_CONCURRENCY', '50'))
+API_RATE_LIMIT = float(os.getenv('API_RATE_LIMIT', '20'))  # requests/sec per host
+FANOUT_OVERLAP_SECONDS = int(os.getenv('FANOUT_OVERLAP_SECONDS', '30'))
+EVENT_TRANSPORT = os.getenv('EVENT_TRANSPORT', 'auto')  # auto | postgres | poll
+ORDER_FILL_TIMEOUT = float(os.getenv('ORDER_FILL_TIMEOUT', '10'))  # seconds before an open order is cancelled
+ORDER_POLL_INITIAL = float(os.getenv('ORDER_POLL_INITIAL', '0.5'))
+ORDER_POLL_MAX = float(os.getenv('ORDER_POLL_MAX', '4'))
+EXECUTOR_WORKERS = int(os.getenv('EXECUTOR_WORKERS', '4'))
+SIGNER_CACHE_TTL = float(os.getenv('SIGNER_CACHE_TTL', '900'))
+SIGNER_CACHE_SIZE = int(os.getenv('SIGNER_CACHE_SIZE', '1000'))
+MARKET_FEED_ENABLED = os.getenv('MARKET_FEED_ENABLED', 'true').lower() == 'true'
+QUOTE_MAX_AGE = float(os.getenv('QUOTE_MAX_AGE', '5'))  # seconds a cached quote may be used
+EXECUTOR_WORKER_ID = os.getenv('EXECUTOR_WORKER_ID', f"{socket.gethostname()}-{os.getpid()}")
+CLAIM_BATCH_SIZE = int(os.getenv('CLAIM_BATCH_SIZE', '100'))
+CLAIM_LEASE_SECONDS = int(os.getenv('CLAIM_LEASE_SECONDS', '60'))
+WATCHER_NODE_ID = os.getenv('WATCHER_NODE_ID', f"{socket.gethostname()}-{os.getpid()}")
+WATCHER_HEARTBEAT_INTERVAL = float(os.getenv('WATCHER_HEARTBEAT_INTERVAL', '5'))
+WATCHER_NODE_TTL = float(os.getenv('WATCHER_NODE_TTL', '30'))  # seconds without heartbeat before a node is dropped
+
+# HTTP transport: a separate pool, timeout budget and rate limit per API
+HTTP2 = os.getenv('HTTP2', 'true').lower() == 'true'
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '3'))  # GETs only
+HTTP_RETRY_BASE_DELAY = float(os.getenv('HTTP_RETRY_BASE_DELAY', '0.2'))
+HTTP_RETRY_MAX_DELAY = float(os.getenv('HTTP_RETRY_MAX_DELAY', '2'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '30'))
+DATA_API_TIMEOUT = float(os.getenv('DATA_API_TIMEOUT', '10'))
+GAMMA_API_TIMEOUT = float(os.getenv('GAMMA_API_TIMEOUT', '10'))
+CLOB_API_TIMEOUT = float(os.getenv('CLOB_API_TIMEOUT', '5'))
+DATA_API_RATE_LIMIT = float(os.getenv('DATA_API_RATE_LIMIT', str(API_RATE_LIMIT)))
+GAMMA_API_RATE_LIMIT = float(os.getenv('GAMMA_API_RATE_LIMIT', str(API_RATE_LIMIT)))
+CLOB_API_RATE_LIMIT = float(os.getenv('CLOB_API_RATE_LIMIT', str(API_RATE_LIMIT)))
+DATA_API_MAX_CONNECTIONS = int(os.getenv('DATA_API_MAX_CONNECTIONS', str(WATCHER_CONCURRENCY)))
+GAMMA_API_MAX_CONNECTIONS = int(os.getenv('GAMMA_API_MAX_CONNECTIONS', '10'))
+CLOB_API_MAX_CONNECTIONS = int(os.getenv('CLOB_API_MAX_CONNECTIONS', '50'))
+
+# Prometheus /metrics ports; 0 disables
+WATCHER_METRICS_PORT = int(os.getenv('WATCHER_METRICS_PORT', '9101'))
+EXECUTOR_METRICS_PORT = int(os.getenv('EXECUTOR_METRICS_PORT', '9102'))
+
+# Retention: finished orders and their trades older than this are archived
+RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', '90'))
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '5000'))
+
+# Processes signing orders in parallel; 0 signs inline on the executor threads
+SIGNING_WORKERS = int(os.getenv('SIGNING_WORKERS', str(os.cpu_count() or 1)))
+
+# Adaptive polling (sync and async watcher modes); false polls every trader each WATCHER_POLL_INTERVAL
+WATCHER_ADAPTIVE = os.getenv('WATCHER_ADAPTIVE', 'true').lower() == 'true'
+WATCHER_POLL_BUDGET = float(os.getenv('WATCHER_POLL_BUDGET', '5'))  # trader polls/sec across all traders
+WATCHER_MIN_INTERVAL = float(os.getenv('WATCHER_MIN_INTERVAL', '2'))
+WATCHER_MAX_INTERVAL = float(os.getenv('WATCHER_MAX_INTERVAL', '120'))
+WATCHER_ACTIVITY_WINDOW = float(os.getenv('WATCHER_ACTIVITY_WINDOW', '24'))  # hours of trades that set a trader's interval
+
+# Data API trade pages: polls page back to the watermark, at most TRADES_MAX_PAGES pages per poll
+TRADES_PAGE_SIZE = int(os.getenv('TRADES_PAGE_SIZE', '100'))
+TRADES_MAX_PAGES = int(os.getenv('TRADES_MAX_PAGES', '50'))
+
+# Copy orders still unexecuted this many seconds after the trader's fill are expired unexecuted; 0 disables.
+# Keep it above the watcher's worst detection lag (WATCHER_MAX_INTERVAL, stretched when over WATCHER_POLL_BUDGET)
+ORDER_TTL_SECONDS = float(os.getenv('ORDER_TTL_SECONDS', '0'))
@@ -0,0 +1,97 @@
+"""Trade events - wakes the executor as soon as the watcher commits new trades"""
+import queue
+import select
+import time
+from sqlalchemy import event, text
+import config
+
+CHANNEL = 'pmct_trades'
+
+
+class LocalChannel:
+    """In-process channel, used when the watcher and executor run together"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+
+    def publish(self, db, trade_ids):
+        """Announce trades once the session's transaction commits"""
+        trade_ids = list(trade_ids)
+        event.listen(db, 'after_commit', lambda session: self.queue.put(trade_ids), once=True)
+
+    def wait(self, timeout):
+        """Block until trades are announced or the timeout passes; returns the trade ids"""
+        try:
+            trade_ids = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                trade_ids.extend(self.queue.get_nowait())
+            except queue.Empty:
+                return trade_ids
+
+
+class PostgresChannel:
+    """LISTEN/NOTIFY channel, works across processes and hosts"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.listener = None
+
+    def publish(self, db, trade_ids):
+        """Queue a NOTIFY in the session's transaction; Postgres delivers it on commit"""
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            'channel': CHANNEL,
+            'payload': str(len(trade_ids))
+        })
+
+    def _connect(self):
+        import psycopg2
+        url = self.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        conn = psycopg2.connect(url)
+        conn.set_isolation_level(0)  # autocommit, required for LISTEN
+        conn.cursor().execute(f"LISTEN {CHANNEL}")
+        return conn
+
+    def wait(self, timeout):
+        """Block until a notification arrives or the timeout passes.
+
+        Returns an empty list on timeout; payloads only carry trade counts.
+        """
+        try:
+            if self.listener is None:
+                self.listener = self._connect()
+
+            if not self.listener.notifies:
+                select.select([self.listener], [], [], timeout)
+            self.listener.poll()
+
+            notified = []
+            while self.listener.notifies:
+                notified.append(self.listener.notifies.pop(0).payload)
+            return notified
+        except Exception as e:
+            print(f"Trade event listener error: {e}")
+            if self.listener is not None:
+                try:
+                    self.listener.close()
+                except Exception:
+                    pass
+            self.listener = None
+            time.sleep(timeout)
+            return []
+
+
+def get_channel():
+    """Channel for EVENT_TRANSPORT; None means the executor falls back to polling"""
+    from models import engine
+
+    transport = config.EVENT_TRANSPORT
+    if transport == 'auto':
+        transport = 'postgres' if engine.dialect.name == 'postgresql' else 'poll'
+
+    if transport == 'postgres':
+        return PostgresChannel(engine)
+    return None
+
@@ -0,0 +1,61 @@
+"""Execution Pool - Runs copy orders in parallel while keeping each follower's orders in sequence"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutionPool:
+    """Worker pool with one serial lane per key (follower).
+
+    Lanes for different followers run on different workers at the same time;
+    tasks within a lane run one after another in submission order.
+    """
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='executor')
+        self.lanes = {}
+        self.in_flight = set()
+        self.lock = threading.Lock()
+
+    def submit(self, key, task_id, fn, *args):
+        """Queue fn(*args) on the key's lane; returns False if task_id is already queued"""
+        with self.lock:
+            if task_id in self.in_flight:
+                return False
+            self.in_flight.add(task_id)
+
+            lane = self.lanes.get(key)
+            if lane is not None:
+                lane.append((task_id, fn, args))
+                return True
+            self.lanes[key] = deque([(task_id, fn, args)])
+
+        self.executor.submit(self._drain, key)
+        return True
+
+    def _drain(self, key):
+        while True:
+            with self.lock:
+                lane = self.lanes[key]
+                if not lane:
+                    del self.lanes[key]
+                    return
+                task_id, fn, args = lane.popleft()
+
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"  ✗ Worker error: {e}")
+            finally:
+                with self.lock:
+                    self.in_flight.discard(task_id)
+
+    def __contains__(self, task_id):
+        return task_id in self.in_flight
+
+    def __len__(self):
+        """Number of queued or running tasks"""
+        return len(self.in_flight)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -1,21 +1,30 @@
 """Executor Service - Executes copy trades"""
 import time
 from datetime import datetime, timedelta
-from web3 import Web3
-from eth_account import Account
-from eth_account.messages import encode_defunct
 from cryptography.fernet import Fernet
-from models import get_db, Follower, Follow, Trade, CopyOrder
+from sqlalchemy import select, update, func, case, cast, literal, and_, or_, Numeric
+from models import get_db, insert_ignore, Follower, Follow, Trade, CopyOrder
 from polymarket_client import PolymarketClient
+from order_tracker import OrderTracker
+from execution_pool import ExecutionPool
+from signer_cache import SignerCache
+from market_data import MarketDataCache
+from signing import SigningService, create_order_hash
 import config
+import events
+import metrics
+from metrics import copy_orders, observe_stage
 
 print("⚡ Executor Service Starting...")
 
-cipher = Fernet(config.ENCRYPTION_KEY.encode())
+_cipher = None
 
 def decrypt_key(encrypted_key):
     """Decrypt private key"""
-    return cipher.decrypt(encrypted_key.encode()).decode()
+    global _cipher
+    if _cipher is None:
+        _cipher = Fernet(config.ENCRYPTION_KEY.encode())
+    return _cipher.decrypt(encrypted_key.encode()).decode()
 
 def calculate_copy_size(original_size, copy_percentage, max_trade_usd, original_price):
     """Calculate the position size to copy, capped by the user's max USD limit"""
@@ -28,37 +37,196 @@ def calculate_copy_size(original_size, copy_percentage, max_trade_usd, original_
     
     return round(percentage_size, 2)
 
+def copy_size_expr():
+    """SQL version of calculate_copy_size over joined Trade and Follow rows"""
+    percentage_size = Trade.size * (Follow.copy_percentage / 100.0)
+    capped = case(
+        (percentage_size * Trade.price > Follow.max_trade_usd, Follow.max_trade_usd / Trade.price),
+        else_=percentage_size
+    )
+    return func.round(cast(capped, Numeric), 2)
+
 def check_slippage(original_price, current_price, max_slippage_pct):
     """Check if slippage is acceptable"""
     slippage = abs(current_price - original_price) / original_price * 100
     return slippage <= max_slippage_pct, slippage
 
 
-def create_order_hash(token_id, maker, side, size, price, nonce, expiration):
-    """Create order hash for signing (simplified)"""
-    from eth_abi import encode
+signers = SignerCache(decrypt_key)
+
+def follower_client(client, follower):
+    """Client carrying the follower's L2 API credentials"""
+    creds = signers.get(follower).api_creds
+    return client.with_auth(creds['key'], creds['secret'], creds['passphrase'], creds['hmac_key'])
+
+def authenticate_follower(client, follower_id):
+    """Client authenticated as the follower, for the order tracker"""
+    db = get_db()
+    try:
+        follower = db.query(Follower).filter(Follower.id == follower_id).first()
+        if follower and follower.encrypted_api_key:
+            return follower_client(client, follower)
+        return client
+    finally:
+        db.close()
+
+tracker = OrderTracker(authenticate_follower)
+pool = ExecutionPool(config.EXECUTOR_WORKERS)
+market_data = MarketDataCache()
+signing = SigningService()
+
+def dispatch_priority():
+    """Dispatch order: the freshest trades first, then the largest copies by notional"""
+    return (Trade.timestamp.desc(), (CopyOrder.size * CopyOrder.target_price).desc(), CopyOrder.id)
+
+def claimable_filter(now):
+    """Pending orders, plus claimed ones whose lease expired (their worker died)"""
+    return [
+        # Matches the ix_copy_orders_claimable predicate so the partial index is used
+        CopyOrder.status.in_(['pending', 'claimed']),
+        or_(
+            CopyOrder.status == 'pending',
+            and_(CopyOrder.status == 'claimed', CopyOrder.lease_expires_at < now)
+        )
+    ]
+
+def expire_orders(db):
+    """Mark claimable orders whose trade is older than ORDER_TTL_SECONDS as expired; returns how many.
     
-    encoded = encode(
-        ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'uint256'],
-        [
-            Web3.to_checksum_address(maker),
-            int(token_id, 16) if token_id.startswith('0x') else int(token_id),
-            int(size * 1e6),
-            int(price * 1e6),
-            nonce,
-            expiration
-        ]
+    One UPDATE, with no API calls: by then the price has usually moved past
+    the follower's slippage limit, so executing them would only delay fresher
+    orders.
+    """
+    if config.ORDER_TTL_SECONDS <= 0:
+        return 0
+    now = datetime.utcnow()
+    stale = select(Trade.id).where(Trade.timestamp < now - timedelta(seconds=config.ORDER_TTL_SECONDS))
+    result = db.execute(
+        update(CopyOrder).where(*claimable_filter(now), CopyOrder.original_trade_id.in_(stale)).values(
+            status='expired',
+            error_message=f'Expired: trade older than {config.ORDER_TTL_SECONDS:g}s'
+        )
     )
+    db.commit()
+    if result.rowcount:
+        copy_orders.inc(result.rowcount, status='expired')
+    return result.rowcount
+
+def claim_orders(db, limit):
+    """Claim up to `limit` orders for this worker and return their ids.
+    
+    Takes claimable orders in dispatch_priority order, using FOR UPDATE SKIP
+    LOCKED so concurrent executors never claim the same order.
+    """
+    now = datetime.utcnow()
+    claimable = select(CopyOrder.id).join(
+        Trade, CopyOrder.original_trade_id == Trade.id
+    ).where(*claimable_filter(now)).order_by(
+        *dispatch_priority()
+    ).limit(limit).with_for_update(skip_locked=True, of=CopyOrder)
     
-    return Web3.keccak(encoded).hex()
+    result = db.execute(
+        update(CopyOrder).where(CopyOrder.id.in_(claimable)).values(
+            status='claimed',
+            claimed_by=config.EXECUTOR_WORKER_ID,
+            lease_expires_at=now + timedelta(seconds=config.CLAIM_LEASE_SECONDS)
+        ).returning(CopyOrder.id)
+    )
+    claimed = [r[0] for r in result]
+    db.commit()
+    return claimed
 
-def execute_copy_trade(copy_order_id, client):
-    """Execute a single copy trade"""
+def pending_count():
+    """Orders waiting to be claimed, for the queue depth gauge"""
     db = get_db()
     try:
-        copy_order = db.query(CopyOrder).filter(CopyOrder.id == copy_order_id).first()
-        if not copy_order or copy_order.status != 'pending':
+        return db.query(func.count(CopyOrder.id)).filter(*claimable_filter(datetime.utcnow())).scalar()
+    finally:
+        db.close()
+
+def renew_claim(db, copy_order_id):
+    """Extend this worker's lease on an order; False if the order is no longer ours"""
+    now = datetime.utcnow()
+    result = db.execute(
+        update(CopyOrder).where(
+            CopyOrder.id == copy_order_id,
+            CopyOrder.status == 'claimed',
+            CopyOrder.claimed_by == config.EXECUTOR_WORKER_ID,
+            CopyOrder.lease_expires_at >= now
+        ).values(lease_expires_at=now + timedelta(seconds=config.CLAIM_LEASE_SECONDS))
+    )
+    db.commit()
+    return result.rowcount == 1
+
+def presign_orders(db, order_ids, quotes):
+    """Sign a claimed batch at its batch quotes with one sign_batch call across the signing pool.
+    
+    Returns {copy order id: (price, nonce, expiration, signature)}. Orders
+    with no fresh quote, whose quote breaks the follower's slippage limit, or
+    that cannot be prepared (e.g. a key that fails to decrypt) are left for
+    execute_copy_trade to price and sign on its own, or to mark failed. If
+    the batch cannot be signed at all, every order is left to it.
+    """
+    rows = db.query(CopyOrder, Trade, Follower, Follow.max_slippage_pct).join(
+        Trade, CopyOrder.original_trade_id == Trade.id
+    ).join(
+        Follower, CopyOrder.follower_id == Follower.id
+    ).join(
+        Follow, and_(Follow.follower_id == CopyOrder.follower_id, Follow.trader_address == Trade.trader_address)
+    ).filter(CopyOrder.id.in_(order_ids)).all()
+    
+    keys, items = [], []
+    nonce = int(time.time() * 1000)
+    expiration = int(time.time()) + 3600
+    for copy_order, trade, follower, max_slippage_pct in rows:
+        quote = quotes.get(trade.market_id)
+        if quote is None or quote.age > market_data.max_age:
+            continue
+        price = quote.price(trade.side)
+        if not price or not check_slippage(copy_order.target_price, price, max_slippage_pct)[0]:
+            continue
+        # Distinct nonces, as when each order was signed at its own millisecond
+        nonce += 1
+        order = {
+            'token_id': trade.market_id,
+            'maker': follower.wallet_address,
+            'side': trade.side,
+            'size': copy_order.size,
+            'price': price,
+            'nonce': nonce,
+            'expiration': expiration
+        }
+        try:
+            account = signers.get(follower).account
+            # Cheap next to signing, and keeps one malformed order from failing the whole batch
+            create_order_hash(**order)
+        except Exception as e:
+            print(f"  ⚠ Not presigning order {copy_order.id}: {str(e) or type(e).__name__}")
+            continue
+        keys.append((copy_order.id, price, nonce))
+        items.append((account, order))
+    
+    try:
+        signatures = signing.sign_batch(items)
+    except Exception as e:
+        print(f"  ⚠ Batch signing failed, signing orders one by one: {e}")
+        return {}
+    return {
+        order_id: (price, nonce, expiration, signature)
+        for (order_id, price, nonce), (_, signature) in zip(keys, signatures)
+    }
+
+def execute_copy_trade(copy_order_id, client, quote=None, presigned=None):
+    """Execute a single copy trade, priced from the batch quote when it is still fresh.
+    
+    `presigned` (from presign_orders) is used when the order is still priced
+    the same; otherwise the order is signed here at its current price.
+    """
+    db = get_db()
+    try:
+        if not renew_claim(db, copy_order_id):
             return
+        copy_order = db.query(CopyOrder).filter(CopyOrder.id == copy_order_id).first()
         
         follower = db.query(Follower).filter(Follower.id == copy_order.follower_id).first()
         trade = db.query(Trade).filter(Trade.id == copy_order.original_trade_id).first()
@@ -69,13 +237,28 @@ def execute_copy_trade(copy_order_id, client):
         
         print(f"Executing copy for {follower.name}: {trade.side} {copy_order.size} @ {trade.market_question[:40]}...")
         
-        current_price = client.get_best_price(trade.market_id, trade.side)
+        # Expired while waiting on the worker pool
+        age = (datetime.utcnow() - trade.timestamp).total_seconds()
+        if 0 < config.ORDER_TTL_SECONDS < age:
+            copy_order.status = 'expired'
+            copy_order.error_message = f'Expired: trade {age:.0f}s old'
+            db.commit()
+            copy_orders.inc(status='expired')
+            print(f"  ⌛ Expired: trade {age:.0f}s old")
+            return
+        
+        if quote is not None and quote.age <= market_data.max_age:
+            current_price = quote.price(trade.side)
+        else:
+            current_price = market_data.get_price(client, trade.market_id, trade.side)
         if not current_price:
             copy_order.status = 'failed'
             copy_order.error_message = 'Could not get current price'
             db.commit()
+            copy_orders.inc(status='failed')
             print(f"  ✗ Failed: No price available")
             return
+        copy_order.priced_at = datetime.utcnow()
         
         acceptable, slippage = check_slippage(copy_order.target_price, current_price, follow.max_slippage_pct)
         if not acceptable:
@@ -83,38 +266,35 @@ def execute_copy_trade(copy_order_id, client):
             copy_order.slippage = slippage
             copy_order.error_message = f'Slippage {slippage:.2f}% exceeds max {follow.max_slippage_pct}%'
             db.commit()
+            copy_orders.inc(status='skipped')
             print(f"  ⊘ Skipped: Slippage too high ({slippage:.2f}%)")
             return
         
-        private_key = decrypt_key(follower.encrypted_private_key)
-        account = Account.from_key(private_key)
+        account = signers.get(follower).account
         
         # Load L2 API credentials for order placement
         if follower.encrypted_api_key:
-            api_key = decrypt_key(follower.encrypted_api_key)
-            api_secret = decrypt_key(follower.encrypted_api_secret)
-            api_passphrase = decrypt_key(follower.encrypted_api_passphrase)
-            client.set_auth(api_key, api_secret, api_passphrase)
+            client = follower_client(client, follower)
         else:
             print(f"  ⚠ Warning: No API keys for {follower.name}. Order placement will likely fail.")
         
-        # Generate order parameters
-        nonce = int(time.time() * 1000)
-        expiration = int((datetime.utcnow() + timedelta(hours=1)).timestamp())
-        
-        order_hash = create_order_hash(
-            token_id=trade.market_id,
-            maker=follower.wallet_address,
-            side=trade.side,
-            size=copy_order.size,
-            price=current_price,
-            nonce=nonce,
-            expiration=expiration
-        )
-        
-        message = encode_defunct(hexstr=order_hash)
-        signed = account.sign_message(message)
-        signature = signed.signature.hex()
+        if presigned is not None and presigned[0] == current_price:
+            _, nonce, expiration, signature = presigned
+        else:
+            # Generate order parameters
+            nonce = int(time.time() * 1000)
+            expiration = int(time.time()) + 3600
+            
+            _, signature = signing.sign(account, {
+                'token_id': trade.market_id,
+                'maker': follower.wallet_address,
+                'side': trade.side,
+                'size': copy_order.size,
+                'price': current_price,
+                'nonce': nonce,
+                'expiration': expiration
+            })
+        copy_order.signed_at = datetime.utcnow()
         
         # Submit the order to the CLOB
         result = client.create_order(
@@ -132,89 +312,107 @@ def execute_copy_trade(copy_order_id, client):
             copy_order.status = 'failed'
             copy_order.error_message = 'Order placement failed'
             db.commit()
+            copy_orders.inc(status='failed')
             print(f"  ✗ Failed: Could not place order")
             return
         
-        order_id = result.get('order_id')
-        
-        # Wait for the order to be matched on the book
-        time.sleep(5)
-        
-        order_status = client.get_order(order_id)
-        if order_status and order_status.get('status', '').lower() == 'filled':
-            copy_order.status = 'filled'
-            copy_order.filled_price = current_price
-            copy_order.filled_at = datetime.utcnow()
-            copy_order.slippage = slippage
-            copy_order.tx_hash = order_status.get('transaction_hash')
-            
-            follow.total_copies += 1
-            db.commit()
-            print(f"  ✓ Filled at {current_price}")
-        else:
-            # Cleanup: Cancel the order if it didn't fill immediately
-            client.cancel_order(order_id)
+        order_id = result.get('order_id') or result.get('orderID')
+        if not order_id:
             copy_order.status = 'failed'
-            copy_order.error_message = 'Order not filled'
+            copy_order.error_message = 'Order placement returned no order id'
             db.commit()
-            print(f"  ✗ Not filled, cancelled")
+            copy_orders.inc(status='failed')
+            print(f"  ✗ Failed: No order id returned")
+            return
+        
+        # Fill status is followed by the tracker so the next order isn't held up
+        copy_order.status = 'submitted'
+        copy_order.exchange_order_id = order_id
+        copy_order.submitted_at = datetime.utcnow()
+        copy_order.lease_expires_at = copy_order.submitted_at + timedelta(
+            seconds=config.ORDER_FILL_TIMEOUT + config.CLAIM_LEASE_SECONDS
+        )
+        copy_order.slippage = slippage
+        db.commit()
+        copy_orders.inc(status='submitted')
+        observe_stage('price', copy_order.created_at, copy_order.priced_at)
+        observe_stage('sign', copy_order.priced_at, copy_order.signed_at)
+        observe_stage('submit', copy_order.signed_at, copy_order.submitted_at)
+        tracker.track(copy_order.id, order_id, follower.id, current_price, copy_order.submitted_at)
+        print(f"  → Submitted at {current_price}, tracking fill")
         
     except Exception as e:
         print(f"  ✗ Execution error: {e}")
         copy_order.status = 'failed'
         copy_order.error_message = str(e)[:500]
         db.commit()
+        copy_orders.inc(status='failed')
     finally:
         db.close()
 
+def record_handoff_latency(db, trade_ids, queued_at):
+    """Observe the time from trade detection to copy order creation and return the longest"""
+    detected = db.query(Trade.created_at).filter(Trade.id.in_(trade_ids)).all()
+    for (created_at,) in detected:
+        observe_stage('queue', created_at, queued_at)
+    return max((queued_at - created_at).total_seconds() for (created_at,) in detected) if detected else 0.0
+
+# created_at of the newest trade already fanned out to followers
+fanout_cursor = None
+
 def process_pending_trades():
-    """Scan for new trader activity and queue copy orders for matching followers"""
+    """Queue copy orders for every active follower of trades detected since the last run.
+    
+    All copy orders are created by a single INSERT ... SELECT over the new trades
+    joined to their active follows; the unique (follower_id, original_trade_id)
+    index makes re-processing the overlap window harmless.
+    """
+    global fanout_cursor
     db = get_db()
     try:
-        # Check trades from the last 10 minutes
-        recent_trades = db.query(Trade).filter(
-            Trade.created_at >= datetime.utcnow() - timedelta(minutes=10)
-        ).all()
+        if fanout_cursor is None:
+            fanout_cursor = datetime.utcnow() - timedelta(minutes=10)
+        
+        # Trades are stamped before they commit, so re-scan a short overlap
+        window_start = fanout_cursor - timedelta(seconds=config.FANOUT_OVERLAP_SECONDS)
+        newest = db.query(func.max(Trade.created_at)).filter(
+            Trade.created_at > window_start
+        ).scalar()
+        if newest is None:
+            return
         
-        for trade in recent_trades:
-            follows = db.query(Follow, Follower).join(
-                Follower, Follow.follower_id == Follower.id
-            ).filter(
-                Follow.trader_address == trade.trader_address,
+        copy_size = copy_size_expr()
+        new_orders = select(
+            Follow.follower_id,
+            Trade.id,
+            copy_size,
+            Trade.price,
+            literal('pending'),
+            literal(datetime.utcnow())
+        ).join_from(
+            Trade, Follow, and_(
+                Follow.trader_address == Trade.trader_address,
                 Follow.active == True
-            ).all()
-            
-            for follow, follower in follows:
-                # Avoid duplicate copying of the same trade
-                existing = db.query(CopyOrder).filter(
-                    CopyOrder.follower_id == follower.id,
-                    CopyOrder.original_trade_id == trade.id
-                ).first()
-                
-                if existing:
-                    continue
-                
-                copy_size = calculate_copy_size(
-                    trade.size,
-                    follow.copy_percentage,
-                    follow.max_trade_usd,
-                    trade.price
-                )
-                
-                if copy_size <= 0:
-                    continue
-                
-                copy_order = CopyOrder(
-                    follower_id=follower.id,
-                    original_trade_id=trade.id,
-                    size=copy_size,
-                    target_price=trade.price,
-                    status='pending'
-                )
-                
-                db.add(copy_order)
-                db.commit()
-                print(f"→ New copy order created: {follower.name} copying {trade.trader_address[:8]}...")
+            )
+        ).where(
+            Trade.created_at > window_start,
+            Trade.created_at <= newest,
+            copy_size > 0
+        )
+        
+        stmt = insert_ignore(CopyOrder, ['follower_id', 'original_trade_id']).from_select(
+            ['follower_id', 'original_trade_id', 'size', 'target_price', 'status', 'created_at'],
+            new_orders
+        ).returning(CopyOrder.original_trade_id)
+        
+        queued_at = datetime.utcnow()
+        trade_ids = [r[0] for r in db.execute(stmt)]
+        db.commit()
+        fanout_cursor = newest
+        
+        if trade_ids:
+            handoff = record_handoff_latency(db, set(trade_ids), queued_at)
+            print(f"→ {len(trade_ids)} new copy orders created (handoff up to {handoff:.2f}s)")
         
     except Exception as e:
         print(f"Error processing trades: {e}")
@@ -223,31 +421,107 @@ def process_pending_trades():
         db.close()
 
 def execute_pending_orders(client):
-    """Execute all pending copy orders"""
+    """Claim a batch of pending copy orders and queue them on the worker pool.
+    
+    Stale orders are expired first, then the rest are claimed and queued
+    freshest first. Orders are priced from one snapshot covering every
+    distinct token, fetched in a single batch request, instead of one price
+    lookup per order, and signed together at those prices on the signing pool.
+    """
     db = get_db()
     try:
-        pending = db.query(CopyOrder).filter(CopyOrder.status == 'pending').all()
-        for order in pending:
-            execute_copy_trade(order.id, client)
-            time.sleep(1)
+        expired = expire_orders(db)
+        if expired:
+            print(f"⌛ {expired} copy orders expired (trade older than {config.ORDER_TTL_SECONDS:g}s)")
+        
+        limit = config.CLAIM_BATCH_SIZE - len(pool)
+        if limit <= 0:
+            return
+        claimed = claim_orders(db, limit)
+        if not claimed:
+            return
+        
+        pending = db.query(CopyOrder.id, CopyOrder.follower_id, Trade.market_id).join(
+            Trade, CopyOrder.original_trade_id == Trade.id
+        ).filter(CopyOrder.id.in_(claimed)).order_by(*dispatch_priority()).all()
+        
+        quotes = market_data.snapshot(client, {p.market_id for p in pending})
+        presigned = presign_orders(db, claimed, quotes)
+        for order_id, follower_id, market_id in pending:
+            pool.submit(follower_id, order_id, execute_copy_trade, order_id, client, quotes.get(market_id),
+                        presigned.get(order_id))
     except Exception as e:
         print(f"Error executing orders: {e}")
+        db.rollback()
     finally:
         db.close()
 
-def main():
+def wait_for_trades(channel):
+    """Sleep until the watcher announces new trades, or at most EXECUTOR_POLL_INTERVAL"""
+    timeout = config.EXECUTOR_POLL_INTERVAL
+    if channel is None:
+        time.sleep(timeout)
+    else:
+        channel.wait(timeout)
+
+def print_market_data_stats():
+    """Summarize quote cache effectiveness and freshness"""
+    stats = market_data.stats()
+    ages = stats['ages'].values()
+    oldest = f", oldest {max(ages):.1f}s" if ages else ""
+    print(f"Market data: {stats['hit_rate']:.0%} hit rate over {stats['hits'] + stats['misses']} lookups, "
+          f"{len(stats['ages'])} quotes{oldest}")
+
+def register_gauges():
+    """Expose worker, tracker and quote cache state on /metrics"""
+    gauge = metrics.registry.gauge
+    gauge('pmct_executor_queue_depth', 'Copy orders queued or running on the worker pool').set_function(lambda: len(pool))
+    gauge('pmct_pending_copy_orders', 'Copy orders waiting to be claimed by an executor').set_function(pending_count)
+    gauge('pmct_open_orders', 'Submitted orders awaiting a fill').set_function(lambda: len(tracker))
+    gauge('pmct_quote_cache_hit_rate', 'Share of price lookups served from the quote cache').set_function(
+        lambda: market_data.stats()['hit_rate']
+    )
+
+def check_order_ttl():
+    """Warn when the order TTL would expire trades the watcher detects late"""
+    if 0 < config.ORDER_TTL_SECONDS <= config.WATCHER_MAX_INTERVAL and config.WATCHER_ADAPTIVE:
+        print(f"⚠ ORDER_TTL_SECONDS ({config.ORDER_TTL_SECONDS:g}) is not above WATCHER_MAX_INTERVAL "
+              f"({config.WATCHER_MAX_INTERVAL:g}): trades of rarely polled traders may expire before they are priced")
+
+def main(channel=None):
     """Main executor loop"""
+    check_order_ttl()
+    # Fork signing workers before the feed and worker threads exist
+    signing.start()
     client = PolymarketClient()
+    register_gauges()
+    metrics.start_server(config.EXECUTOR_METRICS_PORT)
+    if channel is None:
+        channel = events.get_channel()
+    tracker.load_open()
+    tracker.start(client)
+    if config.MARKET_FEED_ENABLED:
+        market_data.start_feed()
+    last_stats = time.monotonic()
     
     while True:
         try:
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Checking for trades to copy...")
             process_pending_trades()
             execute_pending_orders(client)
-            time.sleep(config.EXECUTOR_POLL_INTERVAL)
+            
+            if time.monotonic() - last_stats >= 60:
+                # Adopt open orders from executors that stopped tracking them
+                tracker.load_open()
+                print_market_data_stats()
+                last_stats = time.monotonic()
+            
+            wait_for_trades(channel)
             
         except KeyboardInterrupt:
             print("\n\nExecutor stopped by user")
+            pool.shutdown(wait=False)
+            signing.shutdown()
             break
         except Exception as e:
             print(f"Executor error: {e}")
@@ -0,0 +1,118 @@
+"""Ledger - Per-follower positions and daily realized P&L, maintained as copy orders fill"""
+from datetime import datetime
+from sqlalchemy import func
+from models import dialect_insert, insert_ignore, Position, DailyPnl, CopyOrder, Trade
+
+SIDE_SIGN = {'BUY': 1, 'SELL': -1}
+
+
+def apply_to_position(position, side, size, price):
+    """Apply a fill with average-cost accounting and return the P&L it realized"""
+    quantity = SIDE_SIGN[side.upper()] * size
+    held = position.size or 0.0
+    avg_price = position.avg_price or 0.0
+    realized = 0.0
+
+    remaining = round(held + quantity, 6)
+
+    if held == 0 or (held > 0) == (quantity > 0):
+        # Opening or adding: blend the average cost
+        position.avg_price = (abs(held) * avg_price + abs(quantity) * price) / (abs(held) + abs(quantity))
+    else:
+        # Reducing: realize P&L on the closed part; any excess opens the other way at this price
+        closed = min(abs(quantity), abs(held))
+        realized = closed * (price - avg_price) * (1 if held > 0 else -1)
+        if remaining == 0:
+            position.avg_price = 0.0
+        elif (remaining > 0) != (held > 0):
+            position.avg_price = price
+
+    position.size = remaining
+    position.realized_pnl = (position.realized_pnl or 0.0) + realized
+    position.updated_at = datetime.utcnow()
+    return realized
+
+
+def add_daily(db, follower_id, day, realized, volume, fills=1):
+    """Add to a follower's rollup for the day, creating it on first use"""
+    stmt = dialect_insert(DailyPnl).values(
+        follower_id=follower_id, day=day, realized_pnl=realized, volume_usd=volume, fills=fills
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['follower_id', 'day'],
+        set_={
+            'realized_pnl': DailyPnl.realized_pnl + stmt.excluded.realized_pnl,
+            'volume_usd': DailyPnl.volume_usd + stmt.excluded.volume_usd,
+            'fills': DailyPnl.fills + stmt.excluded.fills
+        }
+    ))
+
+
+def apply_fill(db, follower_id, token_id, side, size, price, filled_at):
+    """Update the follower's position and daily rollup for one fill, in the caller's transaction.
+
+    The position row is locked, so concurrent executors filling the same
+    follower and token apply their fills one after the other.
+    """
+    db.execute(insert_ignore(Position, ['follower_id', 'token_id']).values(
+        follower_id=follower_id, token_id=token_id, size=0.0, avg_price=0.0, realized_pnl=0.0
+    ))
+    position = db.query(Position).filter(
+        Position.follower_id == follower_id,
+        Position.token_id == token_id
+    ).with_for_update().one()
+
+    realized = apply_to_position(position, side, size, price)
+    add_daily(db, follower_id, filled_at.date(), realized, size * price)
+    return realized
+
+
+def mark_to_market(client, positions):
+    """Unrealized P&L of open positions from one batched midpoint lookup.
+
+    Returns (total, {token_id: mid}); positions whose token has no midpoint are
+    left out of the total.
+    """
+    open_positions = [p for p in positions if p.size]
+    if not open_positions:
+        return 0.0, {}
+
+    mids = client.get_midpoints({p.token_id for p in open_positions}) or {}
+    total = sum(p.size * (mids[p.token_id] - p.avg_price) for p in open_positions if p.token_id in mids)
+    return total, mids
+
+
+def rebuild(db):
+    """Recompute every position and daily rollup from filled copy orders, oldest first"""
+    db.query(Position).delete()
+    db.query(DailyPnl).delete()
+
+    positions = {}
+    daily = {}
+    fills = db.query(
+        CopyOrder.follower_id, Trade.market_id, Trade.side, CopyOrder.size,
+        func.coalesce(CopyOrder.filled_price, CopyOrder.target_price),
+        func.coalesce(CopyOrder.filled_at, CopyOrder.created_at)
+    ).join(Trade, CopyOrder.original_trade_id == Trade.id).filter(
+        CopyOrder.status == 'filled'
+    ).order_by(func.coalesce(CopyOrder.filled_at, CopyOrder.created_at)).yield_per(1000)
+
+    count = 0
+    for follower_id, token_id, side, size, price, filled_at in fills:
+        key = (follower_id, token_id)
+        if key not in positions:
+            positions[key] = Position(follower_id=follower_id, token_id=token_id, size=0.0, avg_price=0.0, realized_pnl=0.0)
+        realized = apply_to_position(positions[key], side, size, price)
+
+        day_key = (follower_id, filled_at.date())
+        realized_total, volume, day_fills = daily.get(day_key, (0.0, 0.0, 0))
+        daily[day_key] = (realized_total + realized, volume + size * price, day_fills + 1)
+        count += 1
+
+    db.add_all(positions.values())
+    db.add_all(
+        DailyPnl(follower_id=follower_id, day=day, realized_pnl=realized, volume_usd=volume, fills=day_fills)
+        for (follower_id, day), (realized, volume, day_fills) in daily.items()
+    )
+    db.commit()
+    return count
@@ -0,0 +1,201 @@
+"""Market Data - Shared order book and midpoint cache fed by the CLOB market channel"""
+import asyncio
+import json
+import threading
+import time
+import websockets
+import config
+
+
+class Quote:
+    """Top of book for one token"""
+    __slots__ = ('best_bid', 'best_ask', 'midpoint', 'updated_at')
+
+    def __init__(self, best_bid, best_ask, midpoint=None):
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+        self.midpoint = midpoint
+        self.updated_at = time.monotonic()
+
+    @property
+    def mid(self):
+        if self.midpoint is not None:
+            return self.midpoint
+        if self.best_bid is not None and self.best_ask is not None:
+            return (self.best_bid + self.best_ask) / 2
+        return None
+
+    @property
+    def age(self):
+        return time.monotonic() - self.updated_at
+
+    def price(self, side):
+        """Same preference as PolymarketClient.get_best_price: midpoint, then the touch"""
+        if self.mid is not None:
+            return self.mid
+        return self.best_ask if side == 'BUY' else self.best_bid
+
+
+def _best(levels, pick):
+    prices = []
+    for level in levels or []:
+        try:
+            prices.append(float(level['price']))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return pick(prices) if prices else None
+
+
+class MarketDataCache:
+    """Quotes keyed by token_id, kept fresh by the market WebSocket with REST as fallback.
+
+    A quote older than `max_age` seconds is refreshed from /book before use,
+    with one refresh per token at a time however many orders are waiting on it.
+    """
+
+    def __init__(self, max_age=None):
+        self.max_age = max_age if max_age is not None else config.QUOTE_MAX_AGE
+        self.quotes = {}
+        self.tokens = set()
+        self.refresh_locks = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def update_book(self, token_id, bids, asks):
+        """Store top of book from a full book snapshot"""
+        self.quotes[token_id] = Quote(_best(bids, max), _best(asks, min))
+
+    def update_best(self, token_id, best_bid, best_ask):
+        """Store top of book from best bid/ask values"""
+        self.quotes[token_id] = Quote(
+            float(best_bid) if best_bid not in (None, '') else None,
+            float(best_ask) if best_ask not in (None, '') else None
+        )
+
+    def _fresh(self, token_id):
+        quote = self.quotes.get(token_id)
+        if quote and time.monotonic() - quote.updated_at <= self.max_age:
+            return quote
+        return None
+
+    def get_price(self, client, token_id, side):
+        """Current price for an order, refreshing over REST if the cached quote is stale"""
+        if token_id not in self.tokens:
+            with self.lock:
+                self.tokens.add(token_id)
+
+        quote = self._fresh(token_id)
+        if quote:
+            with self.lock:
+                self.hits += 1
+            return quote.price(side)
+
+        with self.lock:
+            self.misses += 1
+            refresh_lock = self.refresh_locks.setdefault(token_id, threading.Lock())
+
+        with refresh_lock:
+            # Another worker may have refreshed it while we waited
+            quote = self._fresh(token_id)
+            if not quote:
+                book = client.get_order_book(token_id)
+                if not book:
+                    return client.get_best_price(token_id, side)
+                self.update_book(token_id, book.get('bids'), book.get('asks'))
+                quote = self.quotes[token_id]
+        return quote.price(side)
+
+    def snapshot(self, client, token_ids):
+        """Quotes for many tokens, refreshing all stale ones with a single /books request.
+
+        Falls back to one /midpoints request if the book batch fails. Tokens
+        with no price available are left out of the result.
+        """
+        token_ids = set(token_ids)
+        with self.lock:
+            self.tokens |= token_ids
+
+        stale = [t for t in token_ids if not self._fresh(t)]
+        with self.lock:
+            self.misses += len(stale)
+            self.hits += len(token_ids) - len(stale)
+
+        if stale:
+            books = client.get_order_books(stale)
+            if books:
+                for book in books:
+                    self.update_book(book.get('asset_id'), book.get('bids'), book.get('asks'))
+            else:
+                for token_id, mid in (client.get_midpoints(stale) or {}).items():
+                    self.quotes[token_id] = Quote(None, None, mid)
+
+        return {t: self.quotes[t] for t in token_ids if t in self.quotes}
+
+    def stats(self):
+        """Cache hit rate and the age in seconds of each cached quote"""
+        now = time.monotonic()
+        with self.lock:
+            lookups = self.hits + self.misses
+            hit_rate = self.hits / lookups if lookups else 0.0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': hit_rate,
+            'ages': {token_id: now - q.updated_at for token_id, q in list(self.quotes.items())}
+        }
+
+    def handle_message(self, raw):
+        """Apply a market channel message (book snapshot or price change)"""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+
+        for event in message if isinstance(message, list) else [message]:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('event_type')
+
+            if event_type == 'book':
+                self.update_book(event.get('asset_id'), event.get('bids'), event.get('asks'))
+            elif event_type == 'best_bid_ask':
+                self.update_best(event.get('asset_id'), event.get('best_bid'), event.get('best_ask'))
+            elif event_type == 'price_change':
+                for change in event.get('price_changes', []):
+                    if 'best_bid' in change or 'best_ask' in change:
+                        self.update_best(change.get('asset_id'), change.get('best_bid'), change.get('best_ask'))
+
+    async def _run_feed(self):
+        backoff = 1
+        while True:
+            try:
+                async with websockets.connect(f"{config.WS_URL}/market", ping_interval=20) as ws:
+                    with self.lock:
+                        subscribed = set(self.tokens)
+                    await ws.send(json.dumps({'assets_ids': list(subscribed), 'type': 'market'}))
+                    print(f"✓ Market feed connected ({len(subscribed)} tokens)")
+                    backoff = 1
+
+                    while True:
+                        with self.lock:
+                            new_tokens = self.tokens - subscribed
+                        if new_tokens:
+                            await ws.send(json.dumps({'assets_ids': list(new_tokens), 'operation': 'subscribe'}))
+                            subscribed |= new_tokens
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), timeout=1)
+                        except asyncio.TimeoutError:
+                            continue
+                        self.handle_message(raw)
+
+            except Exception as e:
+                print(f"Market feed disconnected ({e}), reconnecting in {backoff}s...")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def start_feed(self):
+        """Run the market channel subscription in a background thread"""
+        thread = threading.Thread(target=lambda: asyncio.run(self._run_feed()), daemon=True, name='market-feed')
+        thread.start()
+        return thread
@@ -0,0 +1,66 @@
+"""Migrations - Versioned schema changes that create_all cannot make on an existing database
+
+init_db() creates missing tables and columns itself; changes such as
+replacing or dropping indexes are listed here and applied once, in order,
+with each applied version recorded in schema_migrations. Every step is
+idempotent, so a migration interrupted part-way is safe to re-run.
+"""
+from sqlalchemy import select, text
+from sqlalchemy.schema import CreateIndex
+from models import Base, SchemaMigration
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+
+def _execute(engine, ddl):
+    # Autocommit, since CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text(ddl))
+
+
+def create_index(engine, table_name, index_name):
+    """Create a declared index if missing, without blocking writes on PostgreSQL"""
+    index = next(i for i in Base.metadata.tables[table_name].indexes if i.name == index_name)
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+    if engine.dialect.name == 'postgresql':
+        ddl = ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)
+    _execute(engine, ddl)
+
+
+def drop_index(engine, index_name):
+    concurrently = 'CONCURRENTLY ' if engine.dialect.name == 'postgresql' else ''
+    _execute(engine, f'DROP INDEX {concurrently}IF EXISTS {index_name}')
+
+
+@migration(1, 'indexes for hot access paths')
+def hot_path_indexes(engine):
+    create_index(engine, 'trades', 'ix_trades_trader_timestamp')
+    create_index(engine, 'trades', 'ix_trades_created_at')
+    create_index(engine, 'copy_orders', 'ix_copy_orders_trade')
+    create_index(engine, 'copy_orders', 'ix_copy_orders_follower_created')
+    create_index(engine, 'copy_orders', 'ix_copy_orders_claimable')
+    create_index(engine, 'copy_orders', 'ix_copy_orders_open')
+    # Superseded by the composite and partial indexes above
+    drop_index(engine, 'ix_trades_trader_address')
+    drop_index(engine, 'ix_copy_orders_status')
+
+
+def upgrade(engine):
+    """Apply migrations newer than the database's recorded versions"""
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigration.version)).scalars())
+
+    for version, name, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        print(f"Applying migration {version}: {name}...")
+        fn(engine)
+        with engine.begin() as conn:
+            conn.execute(SchemaMigration.__table__.insert().values(version=version, name=name))
@@ -1,24 +1,63 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, Float, Boolean, Date, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+import threading
 import config
 
 Base = declarative_base()
 
-engine = create_engine(config.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine)
+_engine = None
+_sessionmaker = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The shared engine, created on first use so importing models loads no database driver"""
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(config.DATABASE_URL, pool_pre_ping=True)
+                _sessionmaker = sessionmaker(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def __getattr__(name):
+    # models.engine and models.SessionLocal still work, creating the engine on first access
+    if name == 'engine':
+        return get_engine()
+    if name == 'SessionLocal':
+        get_engine()
+        return _sessionmaker
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db():
     """Get database session"""
-    db = SessionLocal()
+    get_engine()
+    db = _sessionmaker()
     try:
         return db
     finally:
         pass  
 
 
+def dialect_insert(model):
+    """INSERT construct supporting ON CONFLICT for the configured database dialect"""
+    if get_engine().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def insert_ignore(model, index_elements):
+    """INSERT ... ON CONFLICT DO NOTHING for the configured database dialect"""
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
 class Follower(Base):
     """User who copies trades"""
     __tablename__ = 'followers'
@@ -55,6 +94,12 @@ class Follow(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     follower = relationship('Follower', back_populates='follows')
+    
+    __table_args__ = (
+        # Fan-out lookup: active follows of a trader
+        Index('ix_follows_trader_active', 'trader_address', 'follower_id',
+              postgresql_where=(active == True), sqlite_where=(active == True)),
+    )
 
 
 class Trade(Base):
@@ -62,14 +107,39 @@ class Trade(Base):
     __tablename__ = 'trades'
     
     id = Column(String, primary_key=True)  # tx hash
-    trader_address = Column(String, nullable=False, index=True)
+    trader_address = Column(String, nullable=False)
     market_id = Column(String, nullable=False)
     market_question = Column(String, nullable=False)
     side = Column(String, nullable=False)  # BUY/SELL
     size = Column(Float, nullable=False)
     price = Column(Float, nullable=False)
-    timestamp = Column(DateTime, nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, nullable=False, index=True)  # trader's fill (UTC)
+    created_at = Column(DateTime, default=datetime.utcnow)  # detected by the watcher
+    
+    __table_args__ = (
+        # Watcher: newest trade per trader
+        Index('ix_trades_trader_timestamp', 'trader_address', 'timestamp'),
+        # Fan-out window and retention scans
+        Index('ix_trades_created_at', 'created_at'),
+    )
+
+
+class TraderWatermark(Base):
+    """Timestamp of the newest trade ingested per trader, shared by all watcher nodes"""
+    __tablename__ = 'trader_watermarks'
+    
+    trader_address = Column(String, primary_key=True)
+    last_timestamp = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class WatcherNode(Base):
+    """Live watcher instance; traders are split between nodes with fresh heartbeats"""
+    __tablename__ = 'watcher_nodes'
+    
+    node_id = Column(String, primary_key=True)
+    heartbeat_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, default=datetime.utcnow)
 
 
 class CopyOrder(Base):
@@ -85,15 +155,92 @@ class CopyOrder(Base):
     filled_price = Column(Float)
     slippage = Column(Float)
     
-    status = Column(String, default='pending', index=True)  
+    status = Column(String, default='pending')
     error_message = Column(Text)
     tx_hash = Column(String)
+    exchange_order_id = Column(String)  # CLOB order id while submitted
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Work claiming across executor processes
+    claimed_by = Column(String)
+    lease_expires_at = Column(DateTime)
+    
+    # Pipeline stage timestamps (UTC)
+    created_at = Column(DateTime, default=datetime.utcnow)  # queued
+    priced_at = Column(DateTime)
+    signed_at = Column(DateTime)
+    submitted_at = Column(DateTime)
     filled_at = Column(DateTime)
+    
+    __table_args__ = (
+        # One copy per follower per trade; fan-out relies on this for ON CONFLICT
+        Index('uq_copy_orders_follower_trade', 'follower_id', 'original_trade_id', unique=True),
+        # Retention and trade deletes (foreign key checks)
+        Index('ix_copy_orders_trade', 'original_trade_id'),
+        # Reports: a follower's orders by date
+        Index('ix_copy_orders_follower_created', 'follower_id', 'created_at'),
+        # Claim scan: only unfinished orders are indexed, so it stays small as history grows
+        Index('ix_copy_orders_claimable', 'id',
+              postgresql_where=status.in_(['pending', 'claimed']), sqlite_where=status.in_(['pending', 'claimed'])),
+        # Tracker adoption of submitted orders
+        Index('ix_copy_orders_open', 'claimed_by', 'lease_expires_at',
+              postgresql_where=(status == 'submitted'), sqlite_where=(status == 'submitted')),
+    )
+
+
+
+class SchemaMigration(Base):
+    """Applied versions from migrations.MIGRATIONS"""
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Position(Base):
+    """Net holding of one token per follower, updated as copy orders fill"""
+    __tablename__ = 'positions'
+    
+    follower_id = Column(Integer, ForeignKey('followers.id', ondelete='CASCADE'), primary_key=True)
+    token_id = Column(String, primary_key=True)
+    
+    size = Column(Float, nullable=False, default=0.0)  # shares; negative when net short
+    avg_price = Column(Float, nullable=False, default=0.0)  # average cost of the open size
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DailyPnl(Base):
+    """Realized P&L and traded volume per follower per UTC day"""
+    __tablename__ = 'daily_pnl'
+    
+    follower_id = Column(Integer, ForeignKey('followers.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    
+    realized_pnl = Column(Float, nullable=False, default=0.0)
+    volume_usd = Column(Float, nullable=False, default=0.0)
+    fills = Column(Integer, nullable=False, default=0)
 
 
 def init_db():
     """Initialize database tables"""
+    engine = get_engine()
     Base.metadata.create_all(engine)
+    
+    # create_all skips existing tables, so add columns and indexes introduced since
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+    
+    from migrations import upgrade
+    upgrade(engine)
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     print("✓ Database initialized")
\ No newline at end of file
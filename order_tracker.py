@@ -0,0 +1,231 @@
+"""Order Tracker - Follows submitted copy orders until they fill, cancel or time out"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, or_
+from models import get_db, CopyOrder, Follow, Trade
+import config
+from metrics import copy_orders, observe_stage
+from ledger import apply_fill
+
+FILLED_STATUSES = {'filled', 'matched'}
+CLOSED_STATUSES = {'canceled', 'cancelled', 'unmatched'}
+
+
+class TrackedOrder:
+    """An open order on the CLOB and when to check it next"""
+    __slots__ = ('copy_order_id', 'order_id', 'follower_id', 'price', 'deadline', 'next_check', 'interval')
+
+    def __init__(self, copy_order_id, order_id, follower_id, price, deadline):
+        self.copy_order_id = copy_order_id
+        self.order_id = order_id
+        self.follower_id = follower_id
+        self.price = price
+        self.deadline = deadline
+        self.interval = config.ORDER_POLL_INITIAL
+        self.next_check = time.time() + self.interval
+
+
+class OrderTracker:
+    """Polls open orders with backoff and applies fills, cancels and timeouts to CopyOrder.
+
+    `authenticate(client, follower_id)` must return a client carrying the
+    follower's L2 credentials, since order status and cancels are authenticated.
+    """
+
+    def __init__(self, authenticate, timeout=None):
+        self.authenticate = authenticate
+        self.timeout = timeout or config.ORDER_FILL_TIMEOUT
+        self.orders = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+
+    def track(self, copy_order_id, order_id, follower_id, price=None, submitted_at=None):
+        """Start tracking an order that was just submitted"""
+        submitted = submitted_at.replace(tzinfo=timezone.utc).timestamp() if submitted_at else time.time()
+        order = TrackedOrder(copy_order_id, order_id, follower_id, price, submitted + self.timeout)
+        with self.lock:
+            self.orders[copy_order_id] = order
+        self.wake.set()
+
+    def load_open(self):
+        """Take over submitted orders left by a previous run or by a worker that died.
+
+        Adopts this worker's own submitted orders plus any whose lease has
+        expired, claiming them with SKIP LOCKED so only one executor tracks each.
+        """
+        now = datetime.utcnow()
+        db = get_db()
+        try:
+            adoptable = select(CopyOrder.id).where(
+                CopyOrder.status == 'submitted',
+                or_(
+                    CopyOrder.claimed_by == config.EXECUTOR_WORKER_ID,
+                    CopyOrder.claimed_by.is_(None),
+                    CopyOrder.lease_expires_at < now
+                )
+            ).with_for_update(skip_locked=True)
+
+            result = db.execute(
+                update(CopyOrder).where(CopyOrder.id.in_(adoptable)).values(
+                    claimed_by=config.EXECUTOR_WORKER_ID,
+                    lease_expires_at=now + timedelta(seconds=self.timeout + config.CLAIM_LEASE_SECONDS)
+                ).returning(CopyOrder.id, CopyOrder.exchange_order_id, CopyOrder.follower_id, CopyOrder.submitted_at)
+            )
+            open_orders = [r for r in result if r.id not in self.orders]
+            db.commit()
+
+            for copy_order_id, order_id, follower_id, submitted_at in open_orders:
+                self.track(copy_order_id, order_id, follower_id, submitted_at=submitted_at)
+            if open_orders:
+                print(f"Resumed tracking {len(open_orders)} open orders")
+        except Exception as e:
+            print(f"Error loading open orders: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def __len__(self):
+        return len(self.orders)
+
+    def next_due_in(self):
+        """Seconds until the next order needs checking, or None if nothing is open"""
+        with self.lock:
+            if not self.orders:
+                return None
+            due = min(min(o.next_check, o.deadline) for o in self.orders.values())
+        return max(0.0, due - time.time())
+
+    def start(self, client):
+        """Poll open orders on a background thread, so status checks never hold up claiming"""
+        self.thread = threading.Thread(target=self._run, args=(client,), name='order-tracker', daemon=True)
+        self.thread.start()
+
+    def _run(self, client):
+        while True:
+            try:
+                self.poll(client)
+            except Exception as e:
+                print(f"Order tracker error: {e}")
+            due_in = self.next_due_in()
+            self.wake.wait(config.ORDER_POLL_MAX if due_in is None else due_in)
+            self.wake.clear()
+
+    def poll(self, client):
+        """Check every order that is due and apply the result.
+
+        A follower with several due orders costs one open-orders and one
+        fills request. An order is taken as filled from its fills only once
+        it has left the book; orders still open at their deadline, and those
+        in neither list (in practice, cancelled ones), are fetched one by one.
+        """
+        now = time.time()
+        with self.lock:
+            due = [o for o in self.orders.values() if o.next_check <= now or o.deadline <= now]
+
+        by_follower = {}
+        for order in due:
+            by_follower.setdefault(order.follower_id, []).append(order)
+
+        for follower_id, orders in by_follower.items():
+            try:
+                authed = self.authenticate(client, follower_id)
+                open_ids = fills = None
+                if len(orders) > 1:
+                    open_ids = authed.get_open_orders()
+                    submitted = min(order.deadline for order in orders) - self.timeout
+                    fills = authed.get_fills(after=submitted - 1) if open_ids is not None else None
+            except Exception as e:
+                print(f"  ✗ Error checking orders for follower {follower_id}: {e}")
+                for order in orders:
+                    order.next_check = time.time() + order.interval
+                continue
+
+            for order in orders:
+                try:
+                    if open_ids is not None and order.order_id in open_ids:
+                        # Still resting, possibly partly matched: at the deadline _check cancels the rest
+                        if time.time() < order.deadline:
+                            self._back_off(order)
+                        else:
+                            self._check(order, authed)
+                    elif fills is not None and order.order_id in fills:
+                        self._finish(order, 'filled', fills[order.order_id])
+                    else:
+                        self._check(order, authed)
+                except Exception as e:
+                    print(f"  ✗ Error tracking order {order.order_id}: {e}")
+                    order.next_check = time.time() + order.interval
+
+    def _check(self, order, authed):
+        order_status = authed.get_order(order.order_id)
+        status = (order_status or {}).get('status', '').lower()
+
+        if status in FILLED_STATUSES:
+            self._finish(order, 'filled', order_status)
+            return
+
+        if status in CLOSED_STATUSES:
+            self._finish(order, 'failed', order_status, 'Order cancelled')
+            return
+
+        if time.time() >= order.deadline:
+            # Cleanup: Cancel the order if it didn't fill in time
+            authed.cancel_order(order.order_id)
+            self._finish(order, 'failed', order_status, 'Order not filled')
+            return
+
+        self._back_off(order)
+
+    def _back_off(self, order):
+        order.interval = min(order.interval * 2, config.ORDER_POLL_MAX)
+        order.next_check = min(time.time() + order.interval, order.deadline)
+
+    def _finish(self, order, status, order_status, error_message=None):
+        db = get_db()
+        try:
+            # Conditional, so an order adopted by another executor is finished (and its fill applied) only once
+            result = db.execute(
+                update(CopyOrder).where(
+                    CopyOrder.id == order.copy_order_id,
+                    CopyOrder.status == 'submitted',
+                    CopyOrder.claimed_by == config.EXECUTOR_WORKER_ID
+                ).values(status=status, error_message=error_message)
+            )
+            if result.rowcount != 1:
+                db.rollback()
+            else:
+                if status == 'filled':
+                    copy_order = db.query(CopyOrder).filter(CopyOrder.id == order.copy_order_id).first()
+                    # Book what actually matched, which is less than requested when the rest was cancelled
+                    matched = float((order_status or {}).get('size_matched') or 0)
+                    if 0 < matched < copy_order.size:
+                        copy_order.size = matched
+                    price = order.price or float((order_status or {}).get('price') or copy_order.target_price)
+                    copy_order.filled_price = price
+                    copy_order.filled_at = datetime.utcnow()
+                    copy_order.tx_hash = (order_status or {}).get('transaction_hash')
+
+                    trade = db.query(Trade).filter(Trade.id == copy_order.original_trade_id).first()
+                    follow = db.query(Follow).filter(
+                        Follow.follower_id == copy_order.follower_id,
+                        Follow.trader_address == trade.trader_address
+                    ).first()
+                    if follow:
+                        follow.total_copies += 1
+                    apply_fill(db, copy_order.follower_id, trade.market_id, trade.side,
+                               copy_order.size, price, copy_order.filled_at)
+                    observe_stage('fill', copy_order.submitted_at, copy_order.filled_at)
+                    observe_stage('end_to_end', trade.timestamp, copy_order.filled_at)
+                    print(f"  ✓ Order {copy_order.id} filled at {price}")
+                else:
+                    print(f"  ✗ Order {order.copy_order_id} {error_message.lower()}")
+
+                db.commit()
+                copy_orders.inc(status=status)
+        finally:
+            db.close()
+
+        with self.lock:
+            self.orders.pop(order.copy_order_id, None)
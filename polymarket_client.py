@@ -1,26 +1,66 @@
-import httpx
+import copy
+import json
+from transport import AsyncTransport, data_transport, gamma_transport, clob_transport
+from trade_decoder import decode_trades
 import config
 
 
+def canonical_json(data):
+    """Serialize a request body once, compactly, so the signed string is the sent body"""
+    return json.dumps(data, separators=(',', ':'))
+
+
+def _trades_params(user_address, after_timestamp, page_size):
+    params = {'user': user_address, 'limit': page_size}
+    if after_timestamp:
+        params['after'] = int(after_timestamp)
+    return params
+
+
+def _more_pages(page, page_size, after_timestamp):
+    """Pages come newest first: stop at a short page or once the watermark is reached"""
+    if len(page) < page_size:
+        return False
+    return not after_timestamp or min(record.timestamp for record in page) > after_timestamp
+
+
 class PolymarketClient:
-    """Simple Polymarket API client"""
+    """Simple Polymarket API client.
     
-    def __init__(self):
+    Keyword arguments are passed to every transport's httpx client, e.g.
+    `PolymarketClient(transport=httpx.MockTransport(handler))` in tests.
+    """
+    
+    def __init__(self, **client_kwargs):
         self.clob_url = config.CLOB_API_URL
         self.gamma_url = config.GAMMA_API_URL
         self.data_url = config.DATA_API_URL
         self.ws_url = config.WS_URL
-        self.client = httpx.Client(timeout=30)
+        self.data = data_transport(**client_kwargs)
+        self.gamma = gamma_transport(**client_kwargs)
+        self.clob = clob_transport(**client_kwargs)
         self.api_creds = None
     
-    def set_auth(self, api_key, api_secret, api_passphrase):
+    def set_auth(self, api_key, api_secret, api_passphrase, hmac_key=None):
         """Set L2 API credentials for authenticated requests"""
         self.api_creds = {
             'key': api_key,
             'secret': api_secret,
-            'passphrase': api_passphrase
+            'passphrase': api_passphrase,
+            # A private copy, so the caller's buffer can never change this client's signatures
+            'hmac_key': bytes(hmac_key) if hmac_key is not None else None
         }
     
+    def with_auth(self, api_key, api_secret, api_passphrase, hmac_key=None):
+        """Client authenticated as one follower, sharing this client's connection pool.
+        
+        Unlike set_auth this leaves the shared client untouched, so clients for
+        different followers can be used from different threads at once.
+        """
+        authed = copy.copy(self)
+        authed.set_auth(api_key, api_secret, api_passphrase, hmac_key)
+        return authed
+    
     def _get_auth_headers(self, method, request_path, body=""):
         """Generate Polymarket L2 authentication headers using HMAC-SHA256 signature"""
         # Signature requires: timestamp + method + path + body
@@ -36,7 +76,7 @@ class PolymarketClient:
         message = timestamp + method.upper() + request_path + body
         
         signature = hmac.new(
-            base64.b64decode(self.api_creds['secret']),
+            self.api_creds.get('hmac_key') or base64.b64decode(self.api_creds['secret']),
             message.encode(),
             hashlib.sha256
         ).digest()
@@ -51,24 +91,28 @@ class PolymarketClient:
             'POLY-API-SIGNATURE': sig_b64
         }
     
-    def get_trades(self, user_address, after_timestamp=None):
-        """Get recent trades for a user address using the Data API"""
-        try:
-            params = {'user': user_address}
-            if after_timestamp:
-                params['after'] = int(after_timestamp)
-            
-            response = self.client.get(f"{self.data_url}/trades", params=params)
+    def iter_trades(self, user_address, after_timestamp=None, page_size=None):
+        """Yield pages of TradeRecords, newest first, paging back until the watermark is reached.
+        
+        Request errors are raised, so the caller can keep its watermark and retry.
+        """
+        page_size = page_size or config.TRADES_PAGE_SIZE
+        params = _trades_params(user_address, after_timestamp, page_size)
+        for page_number in range(config.TRADES_MAX_PAGES):
+            params['offset'] = page_number * page_size
+            response = self.data.get("/trades", params=params)
             response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Error fetching trades: {e}")
-            return []
+            page = decode_trades(response.content)
+            if page:
+                yield page
+            if not _more_pages(page, page_size, after_timestamp):
+                return
+        print(f"  ⚠ Stopped paging trades for {user_address[:8]} after {config.TRADES_MAX_PAGES} pages")
     
     def get_market(self, market_id):
         """Get market details"""
         try:
-            response = self.client.get(f"{self.gamma_url}/markets/{market_id}")
+            response = self.gamma.get(f"/markets/{market_id}", endpoint="/markets/{id}")
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -78,7 +122,7 @@ class PolymarketClient:
     def get_order_book(self, token_id):
         """Get order book for a market"""
         try:
-            response = self.client.get(f"{self.clob_url}/book", params={'token_id': token_id})
+            response = self.clob.get("/book", params={'token_id': token_id})
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -88,7 +132,7 @@ class PolymarketClient:
     def get_midpoint(self, token_id):
         """Get midpoint price for a market"""
         try:
-            response = self.client.get(f"{self.clob_url}/midpoint", params={'token_id': token_id})
+            response = self.clob.get("/midpoint", params={'token_id': token_id})
             response.raise_for_status()
             data = response.json()
             return float(data.get('mid')) if data.get('mid') else None
@@ -96,6 +140,28 @@ class PolymarketClient:
             print(f"Error fetching midpoint: {e}")
             return None
     
+    def get_order_books(self, token_ids):
+        """Get order books for many tokens in one request"""
+        try:
+            body = [{'token_id': token_id} for token_id in token_ids]
+            response = self.clob.post("/books", json=body)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Error fetching order books: {e}")
+            return None
+    
+    def get_midpoints(self, token_ids):
+        """Get midpoint prices for many tokens in one request, as {token_id: price}"""
+        try:
+            body = [{'token_id': token_id} for token_id in token_ids]
+            response = self.clob.post("/midpoints", json=body)
+            response.raise_for_status()
+            return {token_id: float(mid) for token_id, mid in response.json().items() if mid}
+        except Exception as e:
+            print(f"Error fetching midpoints: {e}")
+            return None
+    
     def get_best_price(self, token_id, side):
         """Get best available price using midpoint as fallback"""
         mid = self.get_midpoint(token_id)
@@ -134,10 +200,12 @@ class PolymarketClient:
                 'expiration': expiration
             }
             
-            response = self.client.post(f"{self.clob_url}/order", json=order_data)
-            headers = self._get_auth_headers("POST", "/order", str(order_data).replace("'", '"'))
+            # Sign the exact bytes that are sent
+            body = canonical_json(order_data)
+            headers = self._get_auth_headers("POST", "/order", body)
+            headers['Content-Type'] = 'application/json'
             
-            response = self.client.post(f"{self.clob_url}/order", json=order_data, headers=headers)
+            response = self.clob.post("/order", content=body.encode(), headers=headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -152,22 +220,103 @@ class PolymarketClient:
             path = f"/order/{order_id}"
             headers = self._get_auth_headers("GET", path)
             
-            response = self.client.get(f"{self.clob_url}{path}", headers=headers)
+            response = self.clob.get(path, endpoint="/order/{id}", headers=headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             print(f"Error fetching order: {e}")
             return None
     
+    def _get_pages(self, path, params=None):
+        """Every item of a cursor-paginated authenticated GET; 'LTE=' marks the last page"""
+        headers = self._get_auth_headers("GET", path)
+        params = dict(params or {})
+        items = []
+        while True:
+            response = self.clob.get(path, params=params, headers=headers)
+            response.raise_for_status()
+            data = response.json()
+            if not isinstance(data, dict):
+                return items + data
+            items.extend(data.get('data', []))
+            cursor = data.get('next_cursor')
+            if not cursor or cursor == 'LTE=':
+                return items
+            params['next_cursor'] = cursor
+    
+    def get_open_orders(self):
+        """Ids of every open order of the authenticated user; None on error"""
+        try:
+            return {o.get('id') for o in self._get_pages("/data/orders")}
+        except Exception as e:
+            print(f"Error fetching open orders: {e}")
+            return None
+    
+    def get_fills(self, after=None):
+        """The authenticated user's fills since `after` (epoch seconds), summed per order; None on error.
+        
+        Returns {order id: {'size_matched', 'price' (size-weighted), 'transaction_hash'}}.
+        """
+        try:
+            trades = self._get_pages("/data/trades", {'after': int(after)} if after else None)
+        except Exception as e:
+            print(f"Error fetching fills: {e}")
+            return None
+        fills = {}
+        
+        def add(order_id, size, price, trade):
+            fill = fills.setdefault(order_id, {'size_matched': 0.0, 'notional': 0.0,
+                                               'transaction_hash': trade.get('transaction_hash')})
+            fill['size_matched'] += float(size or 0)
+            fill['notional'] += float(size or 0) * float(price or 0)
+        
+        for trade in trades:
+            add(trade.get('taker_order_id'), trade.get('size'), trade.get('price'), trade)
+            for maker_order in trade.get('maker_orders') or []:
+                add(maker_order.get('order_id'), maker_order.get('matched_amount'),
+                    maker_order.get('price', trade.get('price')), trade)
+        for fill in fills.values():
+            notional = fill.pop('notional')
+            fill['price'] = notional / fill['size_matched'] if fill['size_matched'] else None
+        return fills
+    
     def cancel_order(self, order_id):
+        """Cancel an order with L2 auth"""
         try:
             path = "/order"
-            body = f'"{order_id}"' # orderId in body
+            body = canonical_json({'orderID': order_id})
             headers = self._get_auth_headers("DELETE", path, body)
+            headers['Content-Type'] = 'application/json'
             
-            response = self.client.delete(f"{self.clob_url}{path}", params={'order_id': order_id}, headers=headers)
+            response = self.clob.request("DELETE", path, content=body.encode(), headers=headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             print(f"Error cancelling order: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+class AsyncPolymarketClient:
+    """Async Polymarket API client for concurrent polling, rate limited per API"""
+    
+    def __init__(self, **client_kwargs):
+        self.data_url = config.DATA_API_URL
+        self.data = data_transport(AsyncTransport, **client_kwargs)
+    
+    async def iter_trades(self, user_address, after_timestamp=None, page_size=None):
+        """Async variant of PolymarketClient.iter_trades"""
+        page_size = page_size or config.TRADES_PAGE_SIZE
+        params = _trades_params(user_address, after_timestamp, page_size)
+        for page_number in range(config.TRADES_MAX_PAGES):
+            params['offset'] = page_number * page_size
+            response = await self.data.get("/trades", params=params)
+            response.raise_for_status()
+            page = decode_trades(response.content)
+            if page:
+                yield page
+            if not _more_pages(page, page_size, after_timestamp):
+                return
+        print(f"  ⚠ Stopped paging trades for {user_address[:8]} after {config.TRADES_MAX_PAGES} pages")
+    
+    async def aclose(self):
+        await self.data.aclose()
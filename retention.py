@@ -0,0 +1,108 @@
+"""Retention - Moves old trades and their finished copy orders to compressed archive files
+
+Keeping only recent history in the hot tables keeps their indexes, and so
+query latency, flat as total history grows. Archived rows are appended to
+gzip CSV files (one gzip member per batch) before they are deleted, so a run
+that is interrupted may re-archive a batch but never loses one.
+"""
+import csv
+import gzip
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, exists, func
+from sqlalchemy.orm import aliased
+from models import get_db, Trade, CopyOrder
+import config
+
+FINAL_STATUSES = ('filled', 'failed', 'skipped', 'expired')
+
+
+class ArchiveWriter:
+    """Appends rows of one table to <directory>/<table>-<stamp>.csv.gz"""
+
+    def __init__(self, directory, table, stamp):
+        self.table = table
+        self.path = os.path.join(directory, f"{table.name}-{stamp}.csv.gz")
+        self.rows = 0
+
+    def write(self, rows):
+        if not rows:
+            return
+        columns = [c.name for c in self.table.columns]
+        with open(self.path, 'ab') as raw:
+            with gzip.open(raw, 'wt', newline='') as f:
+                writer = csv.writer(f)
+                if self.rows == 0:
+                    writer.writerow(columns)
+                for row in rows:
+                    writer.writerow([
+                        value.isoformat() if isinstance(value, datetime) else value
+                        for value in (row._mapping[c] for c in columns)
+                    ])
+            raw.flush()
+            os.fsync(raw.fileno())
+        self.rows += len(rows)
+
+
+def archivable(cutoff):
+    """Trades detected before the cutoff with no copy order still in flight"""
+    order = aliased(CopyOrder)
+    unfinished = exists().where(
+        order.original_trade_id == Trade.id,
+        order.status.not_in(FINAL_STATUSES)
+    )
+    return [Trade.created_at < cutoff, ~unfinished]
+
+
+def archive(days=None, directory=None, batch_size=None, dry_run=False):
+    """Archive and delete old trades with their copy orders; returns (trades, copy_orders) counts"""
+    days = config.RETENTION_DAYS if days is None else days
+    directory = directory or config.ARCHIVE_DIR
+    batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    trade_filter = archivable(cutoff)
+
+    if dry_run:
+        db = get_db()
+        try:
+            trades = db.query(func.count(Trade.id)).filter(*trade_filter).scalar()
+            orders = db.query(func.count(CopyOrder.id)).join(
+                Trade, CopyOrder.original_trade_id == Trade.id
+            ).filter(*trade_filter).scalar()
+            return trades, orders
+        finally:
+            db.close()
+
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    trades_out = ArchiveWriter(directory, Trade.__table__, stamp)
+    orders_out = ArchiveWriter(directory, CopyOrder.__table__, stamp)
+
+    while True:
+        db = get_db()
+        try:
+            trade_rows = db.execute(
+                select(Trade.__table__).where(*trade_filter).order_by(Trade.created_at).limit(batch_size)
+            ).all()
+            if not trade_rows:
+                break
+            trade_ids = [row.id for row in trade_rows]
+            order_rows = db.execute(
+                select(CopyOrder.__table__).where(CopyOrder.original_trade_id.in_(trade_ids))
+            ).all()
+
+            # Write before deleting, so a failure leaves the rows in place
+            orders_out.write(order_rows)
+            trades_out.write(trade_rows)
+
+            db.execute(delete(CopyOrder).where(CopyOrder.original_trade_id.in_(trade_ids)))
+            db.execute(delete(Trade).where(Trade.id.in_(trade_ids)))
+            db.commit()
+            print(f"  archived {len(trade_rows)} trades, {len(order_rows)} copy orders")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return trades_out.rows, orders_out.rows
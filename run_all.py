@@ -0,0 +1,11 @@
+"""Run the watcher and executor in one process, handing trades over in memory"""
+import threading
+import events
+import watcher
+import executor
+
+if __name__ == '__main__':
+    channel = events.LocalChannel()
+    executor.signing.start()
+    threading.Thread(target=watcher.run, args=(channel,), daemon=True).start()
+    executor.main(channel)
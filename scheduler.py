@@ -0,0 +1,165 @@
+"""Scheduler - Adaptive per-trader poll scheduling for the watcher
+
+Each trader has a target interval set by how often they traded in the
+last WATCHER_ACTIVITY_WINDOW hours and how many active follows point at
+them: busy, widely followed traders are polled every WATCHER_MIN_INTERVAL
+seconds, dormant ones every WATCHER_MAX_INTERVAL. When the planned rate
+exceeds WATCHER_POLL_BUDGET requests per second, every target is
+stretched in proportion, and polls are never started faster than the budget.
+
+Only followed traders' trades are stored, so a newly followed trader has no
+history yet. Traders therefore start at the minimum interval, and return to
+it whenever a poll finds new trades; each empty poll doubles the interval,
+up to the trader's target.
+"""
+import heapq
+import math
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from models import get_db, Follow, Trade
+import config
+import metrics
+
+polls = metrics.registry.counter('pmct_watcher_polls_total', 'Trader polls started by the watcher')
+planned_rate = metrics.registry.gauge('pmct_watcher_planned_poll_rate', 'Planned trader polls per second')
+
+
+def load_activity(traders, window_hours=None):
+    """{trader: (trades in the window, active follows)} for the given traders"""
+    window_hours = window_hours or config.WATCHER_ACTIVITY_WINDOW
+    since = datetime.utcnow() - timedelta(hours=window_hours)
+    addresses = [t.lower() for t in traders]
+
+    db = get_db()
+    try:
+        trades = dict(db.query(Trade.trader_address, func.count(Trade.id)).filter(
+            Trade.trader_address.in_(addresses),
+            Trade.timestamp >= since
+        ).group_by(Trade.trader_address).all())
+        follows = {}
+        for trader_address, count in db.query(Follow.trader_address, func.count(Follow.id)).filter(
+            Follow.active == True
+        ).group_by(Follow.trader_address).all():
+            key = trader_address.lower()
+            follows[key] = follows.get(key, 0) + count
+    finally:
+        db.close()
+
+    return {t: (trades.get(t, 0), follows.get(t, 0)) for t in addresses}
+
+
+def poll_interval(recent_trades, follows, min_interval, max_interval):
+    """Seconds between polls: shorter the more the trader trades and the more followers wait on them"""
+    weight = (1 + recent_trades) * (1 + math.log2(max(follows, 1)))
+    return min(max(max_interval / weight, min_interval), max_interval)
+
+
+class PollScheduler:
+    """Priority queue of traders ordered by their next poll time.
+
+    The loop asks `delay()` how long to wait, takes the next trader with
+    `pop()`, and reports back with `completed()`; a trader is not queued
+    again until its poll completes.
+    """
+
+    def __init__(self, budget=None, min_interval=None, max_interval=None):
+        self.budget = budget or config.WATCHER_POLL_BUDGET
+        self.min_interval = min_interval or config.WATCHER_MIN_INTERVAL
+        self.max_interval = max_interval or config.WATCHER_MAX_INTERVAL
+        self.targets = {}
+        self.intervals = {}
+        self.due = {}
+        self.heap = []
+        self.next_slot = 0.0
+        self.updated_at = None
+
+    def needs_update(self):
+        return self.updated_at is None or time.monotonic() - self.updated_at >= config.WATCHER_POLL_INTERVAL
+
+    def update(self, traders, activity=None):
+        """Recompute target intervals for the current trader set; new traders are due at once"""
+        activity = load_activity(traders) if activity is None else activity
+        targets = {
+            trader: poll_interval(recent, follows, self.min_interval, self.max_interval)
+            for trader, (recent, follows) in activity.items()
+        }
+
+        # Over budget: stretch every interval by the same factor
+        rate = sum(1 / target for target in targets.values())
+        if rate > self.budget:
+            scale = rate / self.budget
+            targets = {trader: target * scale for trader, target in targets.items()}
+            rate = self.budget
+        planned_rate.set(rate)
+
+        now = time.monotonic()
+        for trader in list(self.due):
+            if trader not in targets:
+                del self.due[trader]
+        for trader in list(self.intervals):
+            if trader not in targets:
+                del self.intervals[trader]
+        for trader, target in targets.items():
+            if trader not in self.intervals:
+                self.intervals[trader] = self.min_interval
+                self._schedule(trader, now)
+            elif self.intervals[trader] > target:
+                # Became more active: do not wait out the old, longer interval
+                self.intervals[trader] = target
+                if trader in self.due and self.due[trader] > now + target:
+                    self._schedule(trader, now + target)
+
+        self.targets = targets
+        self.updated_at = now
+        return rate
+
+    def _schedule(self, trader, at):
+        self.due[trader] = at
+        heapq.heappush(self.heap, (at, trader))
+
+    def _peek(self):
+        # Skip entries superseded by a reschedule, or for traders no longer queued
+        while self.heap:
+            at, trader = self.heap[0]
+            if self.due.get(trader) == at:
+                return at
+            heapq.heappop(self.heap)
+        return None
+
+    def delay(self):
+        """Seconds until the next poll may start; WATCHER_POLL_INTERVAL when nothing is queued"""
+        at = self._peek()
+        if at is None:
+            return config.WATCHER_POLL_INTERVAL
+        return max(0.0, max(at, self.next_slot) - time.monotonic())
+
+    def pop(self):
+        """Take the next due trader and reserve its slot in the request budget"""
+        if self._peek() is None:
+            return None
+        _, trader = heapq.heappop(self.heap)
+        del self.due[trader]
+        now = time.monotonic()
+        self.next_slot = max(self.next_slot, now) + 1 / self.budget
+        polls.inc()
+        return trader
+
+    def completed(self, trader, new_trades):
+        """Queue the trader's next poll after one finishes"""
+        target = self.targets.get(trader)
+        if target is None:
+            return
+        if new_trades:
+            interval = min(self.min_interval, target)
+        else:
+            interval = min(self.intervals[trader] * 2, target)
+        self.intervals[trader] = interval
+        self._schedule(trader, time.monotonic() + interval)
+
+    def describe(self):
+        if not self.targets:
+            return "no traders"
+        targets = self.targets.values()
+        rate = sum(1 / t for t in targets)
+        return f"{len(self.targets)} traders, every {min(targets):.1f}s-{max(targets):.0f}s when idle, ~{rate:.1f} polls/s"
@@ -0,0 +1,109 @@
+"""Benchmark decoding of Data API trade pages: the old dict path vs TradeRecord decoding
+
+    python scripts/bench_decode.py --fixture test_trade.json --page-size 100 --pages 200
+
+Builds pages by repeating the trades in the fixture (UTF-8 or UTF-16, as
+saved by PowerShell) with distinct ids, then reports trades decoded per
+second, MB/s and the memory a decoded page holds for each path.
+"""
+import codecs
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import click
+
+sys.path.insert(0, '.')
+
+import trade_decoder
+from trade_decoder import TradeRecord, decode_trades
+
+
+def read_fixture(path):
+    raw = open(path, 'rb').read()
+    encoding = 'utf-16' if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) else 'utf-8-sig'
+    data = json.loads(raw.decode(encoding))
+    return data if isinstance(data, list) else [data]
+
+
+def make_page(trades, page_size, page_number):
+    """One page of JSON bytes, as the Data API sends it"""
+    page = []
+    for i in range(page_size):
+        trade = dict(trades[i % len(trades)])
+        trade['transactionHash'] = '0x%064x' % (page_number * page_size + i)
+        trade['timestamp'] = trade.get('timestamp', 1770000000) - i
+        page.append(trade)
+    return json.dumps(page).encode()
+
+
+def legacy_decode(content):
+    """The watcher's previous path: response.json(), then a row dict per trade with key probing"""
+    rows = []
+    for trade_data in json.loads(content):
+        timestamp_val = trade_data.get('timestamp')
+        if isinstance(timestamp_val, (int, float)):
+            timestamp = datetime.fromtimestamp(timestamp_val, timezone.utc).replace(tzinfo=None)
+        else:
+            timestamp = datetime.utcnow()
+        rows.append({
+            'id': trade_data.get('id') or trade_data.get('transaction_hash') or trade_data.get('transactionHash'),
+            'market_id': trade_data.get('asset_id') or trade_data.get('market') or trade_data.get('asset'),
+            'market_question': trade_data.get('title') or "Unknown",
+            'side': trade_data.get('side', '').upper(),
+            'size': float(trade_data.get('size', 0)),
+            'price': float(trade_data.get('price', 0)),
+            'timestamp': timestamp
+        })
+    return rows
+
+
+def stdlib_decode(content):
+    """TradeRecord decoding with the standard json module, as used when orjson is not installed"""
+    return [TradeRecord.from_dict(item) for item in json.loads(content)]
+
+
+def measure(label, decode, pages, trades_per_page):
+    start = time.perf_counter()
+    for content in pages:
+        decode(content)
+    elapsed = time.perf_counter() - start
+
+    # Memory held by one decoded page, i.e. what a caller keeps while it is being ingested
+    tracemalloc.start()
+    result = decode(pages[0])
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    total = len(pages) * trades_per_page
+    megabytes = sum(len(content) for content in pages) / 1e6
+    print(f"{label:<22} {total / elapsed:>10.0f} trades/s {megabytes / elapsed:>8.1f} MB/s {held / trades_per_page:>8.0f} bytes/trade")
+    return total / elapsed
+
+
+@click.command()
+@click.option('--fixture', default='test_trade.json', help='JSON file with a Data API trade or list of trades')
+@click.option('--page-size', default=100, help='Trades per page')
+@click.option('--pages', default=200, help='Pages to decode per run')
+def main(fixture, page_size, pages):
+    """Compare trade page decoders"""
+    trades = read_fixture(fixture)
+    contents = [make_page(trades, page_size, n) for n in range(pages)]
+    print(f"Decoding {pages} pages of {page_size} trades ({len(contents[0]) / 1e3:.0f} kB each) from {fixture}\n")
+
+    assert [r['id'] for r in legacy_decode(contents[0])] == [r.id for r in decode_trades(contents[0])]
+
+    baseline = measure('legacy dicts', legacy_decode, contents, page_size)
+    rate = measure('records (json)', stdlib_decode, contents, page_size)
+    print(f"{'':<22} {rate / baseline:>10.2f}x legacy")
+    if trade_decoder.loads is not json.loads:
+        rate = measure('records (orjson)', decode_trades, contents, page_size)
+        print(f"{'':<22} {rate / baseline:>10.2f}x legacy")
+    else:
+        print("orjson is not installed; install it for the fast path")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark order signing: inline (the old executor path) vs the SigningService process pool
+
+    python scripts/bench_signing.py --orders 2000 --keys 200
+
+Reports orders signed per second, and per core used, for each worker count:
+once for sign_batch (how the executor signs a claimed batch) and once for
+per-order sign() calls from EXECUTOR_WORKERS threads (orders re-signed at
+a new price when they run).
+"""
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import click
+
+sys.path.insert(0, '.')
+
+from eth_account import Account
+from signing import SigningService, sign_order
+import config
+
+
+def make_orders(count, keys):
+    accounts = [Account.create() for _ in range(keys)]
+    orders = []
+    for i in range(count):
+        account = random.choice(accounts)
+        orders.append((account, {
+            'token_id': str(random.getrandbits(250)),
+            'maker': account.address,
+            'side': random.choice(['BUY', 'SELL']),
+            'size': round(random.uniform(1, 500), 2),
+            'price': round(random.uniform(0.01, 0.99), 4),
+            'nonce': int(time.time() * 1000) + i,
+            'expiration': int(time.time()) + 3600
+        }))
+    return orders
+
+
+def report(label, count, elapsed, cores):
+    rate = count / elapsed
+    print(f"{label:<24} {rate:>10.0f} orders/s {rate / cores:>10.0f} orders/s/core")
+    return rate
+
+
+@click.command()
+@click.option('--orders', default=2000, help='Orders to sign per run')
+@click.option('--keys', default=200, help='Distinct follower keys')
+@click.option('--workers', 'worker_counts', multiple=True, type=int,
+              help='Worker counts to test (default: 1, 2, 4 ... up to the CPU count)')
+def main(orders, keys, worker_counts):
+    """Compare inline signing with the process pool"""
+    cpus = os.cpu_count() or 1
+    if not worker_counts:
+        worker_counts = sorted({min(2 ** i, cpus) for i in range(cpus.bit_length() + 1)})
+
+    items = make_orders(orders, keys)
+    print(f"Signing {orders} orders with {keys} keys on {cpus} CPUs\n")
+
+    start = time.perf_counter()
+    expected = [sign_order(account, order) for account, order in items]
+    baseline = report('inline', orders, time.perf_counter() - start, 1)
+
+    for workers in worker_counts:
+        service = SigningService(workers)
+        service.start()
+        start = time.perf_counter()
+        results = service.sign_batch(items)
+        rate = report(f"pool, {workers} workers", orders, time.perf_counter() - start, min(workers, cpus))
+        assert results == expected, "pool signatures differ from inline signatures"
+        print(f"{'':<24} {rate / baseline:>10.2f}x inline")
+
+        with ThreadPoolExecutor(config.EXECUTOR_WORKERS) as threads:
+            start = time.perf_counter()
+            results = list(threads.map(lambda item: service.sign(*item), items))
+            rate = report(f"  per order, {config.EXECUTOR_WORKERS} threads", orders, time.perf_counter() - start,
+                          min(workers, cpus))
+        service.shutdown()
+        assert results == expected, "pool signatures differ from inline signatures"
+        print(f"{'':<24} {rate / baseline:>10.2f}x inline")
+
+
+if __name__ == '__main__':
+    main()
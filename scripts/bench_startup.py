@@ -0,0 +1,77 @@
+"""Benchmark CLI and service startup time against a budget
+
+    python scripts/bench_startup.py --runs 5 --budget 300
+
+Runs each command in a fresh interpreter against a scratch SQLite database
+and reports the median wall-clock time, alongside a bare `python -c pass`
+for reference. Exits non-zero when `admin stats` exceeds the budget (ms).
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import click
+from cryptography.fernet import Fernet
+
+COMMANDS = {
+    'python': [sys.executable, '-c', 'pass'],
+    'admin --help': [sys.executable, 'admin', '--help'],
+    'admin stats': [sys.executable, 'admin', 'stats'],
+    'import watcher': [sys.executable, '-c', 'import watcher'],
+    'import executor': [sys.executable, '-c', 'import executor'],
+}
+GATED = 'admin stats'
+
+
+def run(command, env):
+    start = time.perf_counter()
+    subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(command, env, count):
+    """Top-level imports that took longest, from -X importtime"""
+    result = subprocess.run(
+        [command[0], '-X', 'importtime'] + command[1:], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S+)$', line)
+        if match:
+            imports.append((int(match.group(1)) / 1000, match.group(2)))
+    return sorted(imports, reverse=True)[:count]
+
+
+@click.command()
+@click.option('--runs', default=5, help='Runs per command; the median is reported')
+@click.option('--budget', default=300.0, help=f'Maximum median ms for `{GATED}`')
+@click.option('--imports', 'import_count', default=0, help='Also list this many of the slowest top-level imports per command')
+@click.option('--database', default=None, help='Database URL (default: a scratch SQLite file)')
+def main(runs, budget, import_count, database):
+    """Time fresh-process startup of the CLI and services"""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = database or f"sqlite:///{tempfile.mkdtemp(prefix='pmct-startup-')}/startup.db"
+    env.setdefault('ENCRYPTION_KEY', Fernet.generate_key().decode())
+    subprocess.run([sys.executable, '-c', 'import models; models.init_db()'], env=env, check=True, stdout=subprocess.DEVNULL)
+
+    results = {}
+    for label, command in COMMANDS.items():
+        run(command, env)  # warm the OS cache and bytecode
+        results[label] = statistics.median(run(command, env) for _ in range(runs))
+        print(f"{label:<18} {results[label]:>8.0f} ms")
+        for seconds, module in slowest_imports(command, env, import_count) if import_count else []:
+            print(f"{'':<20}{module:<28} {seconds:>6.0f} ms")
+
+    elapsed = results[GATED]
+    print(f"\n{GATED}: {elapsed:.0f} ms ({elapsed - results['python']:.0f} ms over bare interpreter start), budget {budget:.0f} ms")
+    if elapsed > budget:
+        print("✗ Over budget")
+        sys.exit(1)
+    print("✓ Within budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""Load Test - Replays synthetic trader activity through the real watcher and executor
+
+Starts scripts/simulator.py in a child process, seeds a scratch database with
+N traders and M followers, runs the watcher and executor in this process
+(handing trades over in memory, as run_all.py does) and reports throughput,
+detection-to-fill latency, database query counts and CPU use.
+
+    python scripts/loadtest.py --traders 50 --followers 200 --rate 10 --duration 60
+
+Run it from the repository root. By default it uses a throwaway SQLite file;
+pass --database to test against PostgreSQL, but only with a scratch database.
+Exits with status 1 when --max-p99 or --min-throughput is not met, so it can
+gate a deployment.
+"""
+import base64
+import contextlib
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import click
+import httpx
+from cryptography.fernet import Fernet
+
+sys.path.insert(0, '.')
+
+SIMULATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'simulator.py')
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def start_simulator(port, ws_port, traders, rate, skew, duration, latency, error_rate, timeout_rate, reset_rate,
+                    fill_rate, fill_delay, credentials_path):
+    """Launch the simulator and wait until its REST port answers"""
+    process = subprocess.Popen([
+        sys.executable, SIMULATOR,
+        '--port', str(port), '--ws-port', str(ws_port), '--traders', str(traders),
+        '--rate', str(rate), '--skew', str(skew), '--duration', str(duration), '--latency', str(latency),
+        '--error-rate', str(error_rate), '--timeout-rate', str(timeout_rate), '--reset-rate', str(reset_rate),
+        '--fill-rate', str(fill_rate), '--fill-delay', str(fill_delay),
+        '--credentials', credentials_path
+    ], stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/markets/none", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise click.ClickException("Simulator did not start")
+
+
+def seed(traders, followers, follows_per_follower, cipher):
+    """Create followers with encrypted keys and L2 credentials, each following random traders.
+
+    Returns {api key: secret} so the simulator can verify request signatures.
+    """
+    from eth_account import Account
+    from models import get_db, Follower, Follow
+
+    encrypt = lambda value: cipher.encrypt(value.encode()).decode()
+    credentials = {}
+    db = get_db()
+    try:
+        for i in range(followers):
+            account = Account.create()
+            api_key = secrets.token_hex(16)
+            credentials[api_key] = base64.b64encode(secrets.token_bytes(32)).decode()
+            follower = Follower(
+                name=f"loadtest-{i}",
+                email=f"loadtest-{i}@example.com",
+                wallet_address=account.address,
+                encrypted_private_key=encrypt(account.key.hex()),
+                encrypted_api_key=encrypt(api_key),
+                encrypted_api_secret=encrypt(credentials[api_key]),
+                encrypted_api_passphrase=encrypt(secrets.token_hex(16))
+            )
+            db.add(follower)
+            db.flush()
+            for trader_address in random.sample(traders, min(follows_per_follower, len(traders))):
+                db.add(Follow(
+                    follower_id=follower.id,
+                    trader_address=trader_address,
+                    copy_percentage=10.0,
+                    max_trade_usd=100.0,
+                    max_slippage_pct=5.0
+                ))
+        db.commit()
+    finally:
+        db.close()
+    return credentials
+
+
+def outstanding_orders():
+    """Copy orders not yet in a final state"""
+    from models import get_db, CopyOrder
+
+    db = get_db()
+    try:
+        return db.query(CopyOrder).filter(CopyOrder.status.in_(['pending', 'claimed', 'submitted'])).count()
+    finally:
+        db.close()
+
+
+def collect_results(started_at):
+    """Trade and copy order outcomes for the run, with per-order latencies in seconds"""
+    from sqlalchemy import func
+    from models import get_db, Trade, CopyOrder
+
+    db = get_db()
+    try:
+        trades = db.query(func.count(Trade.id)).filter(Trade.created_at >= started_at).scalar()
+        statuses = dict(db.query(CopyOrder.status, func.count(CopyOrder.id)).filter(
+            CopyOrder.created_at >= started_at
+        ).group_by(CopyOrder.status).all())
+        filled = db.query(Trade.timestamp, Trade.created_at, CopyOrder.filled_at).join(
+            CopyOrder, CopyOrder.original_trade_id == Trade.id
+        ).filter(CopyOrder.status == 'filled', CopyOrder.created_at >= started_at).all()
+    finally:
+        db.close()
+
+    return {
+        'trades': trades,
+        'statuses': statuses,
+        'detect_to_fill': [(filled_at - created_at).total_seconds() for _, created_at, filled_at in filled],
+        'end_to_end': [(filled_at - timestamp).total_seconds() for timestamp, _, filled_at in filled]
+    }
+
+
+def http_summary():
+    """Request counts and non-2xx responses per API from the transport metrics"""
+    from metrics import http_latency
+
+    summary = {}
+    with http_latency.lock:
+        for (api, _, _, status), (_, _, count) in http_latency.values.items():
+            requests, errors = summary.get(api, (0, 0))
+            summary[api] = (requests + count, errors + (0 if status.startswith('2') else count))
+    return summary
+
+
+@click.command()
+@click.option('--traders', default=20, help='Synthetic traders generating activity')
+@click.option('--followers', default=50, help='Followers copying them')
+@click.option('--follows', 'follows_per_follower', default=5, help='Traders followed by each follower')
+@click.option('--rate', default=5.0, help='Trader fills per second across all traders')
+@click.option('--skew', default=0.0, help='Zipf exponent of activity across traders (0 is uniform)')
+@click.option('--duration', default=30.0, help='Seconds of trader activity to replay')
+@click.option('--drain', default=30.0, help='Seconds to wait afterwards for open copy orders to finish')
+@click.option('--watcher-mode', type=click.Choice(['sync', 'async', 'stream']), default='stream')
+@click.option('--latency', default=0.02, help='Mean simulated API latency in seconds')
+@click.option('--error-rate', default=0.0, help='Share of simulated API requests failing with 503')
+@click.option('--timeout-rate', default=0.0, help='Share of simulated API requests hanging past the client timeout')
+@click.option('--reset-rate', default=0.0, help='Share of simulated API requests whose connection is reset')
+@click.option('--fill-rate', default=1.0, help='Share of simulated orders that fill')
+@click.option('--fill-delay', default=0.5, help='Seconds before a simulated order fills')
+@click.option('--port', default=8900, help='Simulator REST port (the WebSocket uses port + 1)')
+@click.option('--database', default=None, help='Scratch database URL (default: temporary SQLite file)')
+@click.option('--log', 'log_path', default=os.devnull, help='File for watcher and executor output')
+@click.option('--max-p99', default=None, type=float, help='Fail if p99 detection-to-fill exceeds this many seconds')
+@click.option('--min-throughput', default=None, type=float, help='Fail if fewer filled copies per second')
+def main(traders, followers, follows_per_follower, rate, skew, duration, drain, watcher_mode, latency, error_rate,
+         timeout_rate, reset_rate, fill_rate, fill_delay, port, database, log_path, max_p99, min_throughput):
+    """Run a load test against the local simulator"""
+    from simulator import synthetic_traders
+
+    scratch = tempfile.mkdtemp(prefix='pmct-loadtest-')
+    ws_port = port + 1
+    os.environ.update({
+        'DATABASE_URL': database or f"sqlite:///{scratch}/loadtest.db",
+        'DATA_API_URL': f"http://127.0.0.1:{port}",
+        'GAMMA_API_URL': f"http://127.0.0.1:{port}",
+        'CLOB_API_URL': f"http://127.0.0.1:{port}",
+        'WS_URL': f"ws://127.0.0.1:{ws_port}",
+        'ACTIVITY_WS_URL': f"ws://127.0.0.1:{ws_port}",
+        'WATCHER_MODE': watcher_mode,
+        'WATCHER_POLL_INTERVAL': os.getenv('WATCHER_POLL_INTERVAL', '1'),
+        'EXECUTOR_POLL_INTERVAL': '1',
+        'WATCHER_METRICS_PORT': '0',
+        'EXECUTOR_METRICS_PORT': '0'
+    })
+    if not os.getenv('ENCRYPTION_KEY'):
+        os.environ['ENCRYPTION_KEY'] = Fernet.generate_key().decode()
+
+    # Configuration is read at import time, so the services are imported only now
+    from sqlalchemy import event
+    import config
+    import models
+
+    models.init_db()
+    addresses = synthetic_traders(traders)
+    credentials = seed(addresses, followers, follows_per_follower, Fernet(config.ENCRYPTION_KEY.encode()))
+    credentials_path = os.path.join(scratch, 'credentials.json')
+    with open(credentials_path, 'w') as f:
+        json.dump(credentials, f)
+    click.echo(f"Seeded {followers} followers following {follows_per_follower} of {traders} traders", err=True)
+
+    queries = [0]
+    event.listen(models.engine, 'before_cursor_execute', lambda *args: queries.__setitem__(0, queries[0] + 1))
+
+    simulator = start_simulator(port, ws_port, traders, rate, skew, duration, latency, error_rate, timeout_rate,
+                                reset_rate, fill_rate, fill_delay, credentials_path)
+    log = open(log_path, 'w')
+    try:
+        with contextlib.redirect_stdout(log):
+            import events
+            import watcher
+            import executor
+
+            started_at = datetime.utcnow()
+            wall_start, cpu_start, queries_start = time.monotonic(), time.process_time(), queries[0]
+
+            channel = events.LocalChannel()
+            threading.Thread(target=watcher.run, args=(channel,), daemon=True, name='watcher').start()
+            threading.Thread(target=executor.main, args=(channel,), daemon=True, name='executor').start()
+
+            time.sleep(duration)
+            click.echo(f"Replayed {duration:.0f}s of activity, draining open orders...", err=True)
+            deadline = time.monotonic() + drain
+            time.sleep(min(drain, config.WATCHER_POLL_INTERVAL + 1))
+            while time.monotonic() < deadline and outstanding_orders():
+                time.sleep(0.5)
+
+            wall = time.monotonic() - wall_start
+            cpu = time.process_time() - cpu_start
+            query_count = queries[0] - queries_start
+    finally:
+        simulator.terminate()
+        log.close()
+
+    from metrics import stage_latency
+
+    results = collect_results(started_at)
+    statuses = results['statuses']
+    filled = statuses.get('filled', 0)
+    throughput = filled / wall if wall else 0.0
+    copies = sum(statuses.values())
+
+    print("\nLoad test results")
+    print(f"  traders {traders}, followers {followers}, {rate:g} fills/s for {duration:g}s, watcher {watcher_mode}")
+    print(f"  trades detected     {results['trades']}")
+    print(f"  copy orders         {copies} ({', '.join(f'{k} {v}' for k, v in sorted(statuses.items())) or 'none'})")
+    print(f"  throughput          {throughput:.2f} filled copies/s over {wall:.1f}s")
+    for label, key in (('detection → fill', 'detect_to_fill'), ('trader fill → fill', 'end_to_end')):
+        p50, p99 = percentile(results[key], 0.5), percentile(results[key], 0.99)
+        if p50 is None:
+            print(f"  {label:<19} no fills")
+        else:
+            print(f"  {label:<19} p50 {p50:.3f}s  p99 {p99:.3f}s")
+    stages = [(stage, stage_latency.quantile(0.5, stage=stage))
+              for stage in ('detect', 'queue', 'price', 'sign', 'submit', 'fill')]
+    print(f"  stage p50           {'  '.join(f'{stage} {q:g}s' for stage, q in stages if q is not None)}")
+    print(f"  db queries          {query_count} ({query_count / max(copies, 1):.1f} per copy order)")
+    print(f"  cpu                 {cpu:.1f}s ({cpu / wall:.0%} of one core)")
+    for api, (requests, errors) in sorted(http_summary().items()):
+        print(f"  {api + ' api':<19} {requests} requests, {errors} errors")
+
+    failures = []
+    p99 = percentile(results['detect_to_fill'], 0.99)
+    if max_p99 is not None and (p99 is None or p99 > max_p99):
+        failures.append(f"p99 detection-to-fill {p99}s exceeds {max_p99}s")
+    if min_throughput is not None and throughput < min_throughput:
+        failures.append(f"throughput {throughput:.2f}/s below {min_throughput}/s")
+    for failure in failures:
+        print(f"✗ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""Polymarket Simulator - Local stand-in for the Data, Gamma and CLOB APIs and their WebSockets
+
+Serves the endpoints PolymarketClient and the market / activity feeds use,
+with configurable latency, error rate and fill behaviour, so the watcher and
+executor can be run and load tested without touching the real exchange.
+
+    python scripts/simulator.py --traders 20 --rate 5 --latency 0.02
+
+Point the services at it with:
+
+    DATA_API_URL=http://127.0.0.1:8900 GAMMA_API_URL=http://127.0.0.1:8900 \\
+    CLOB_API_URL=http://127.0.0.1:8900 WS_URL=ws://127.0.0.1:8901 \\
+    ACTIVITY_WS_URL=ws://127.0.0.1:8901
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import click
+import websockets
+
+
+class Market:
+    """One outcome token whose midpoint drifts in a small random walk"""
+
+    def __init__(self, token_id, question, mid):
+        self.token_id = token_id
+        self.question = question
+        self.mid = mid
+
+    def step(self, volatility=0.002):
+        self.mid = min(0.97, max(0.03, self.mid + random.uniform(-volatility, volatility)))
+
+    def book(self, spread=0.01):
+        bid, ask = round(self.mid - spread / 2, 4), round(self.mid + spread / 2, 4)
+        return {
+            'asset_id': self.token_id,
+            'market': self.token_id,
+            'bids': [{'price': str(round(bid - 0.01 * i, 4)), 'size': '500'} for i in range(3)],
+            'asks': [{'price': str(round(ask + 0.01 * i, 4)), 'size': '500'} for i in range(3)],
+            'timestamp': str(int(time.time() * 1000))
+        }
+
+
+class Exchange:
+    """Simulated markets, trader activity and order lifecycle.
+
+    Each order fills with probability `fill_rate` after `fill_delay` seconds
+    and otherwise stays live until cancelled. Every request waits about
+    `latency` seconds and fails with a 503 with probability `error_rate`,
+    hangs for `hang` seconds (past any client timeout) with probability
+    `timeout_rate`, or has its connection reset with probability `reset_rate`.
+    With `credentials` ({api key: base64 secret}), order endpoints require
+    a valid L2 signature, as the CLOB does.
+    """
+
+    def __init__(self, markets=20, latency=0.0, error_rate=0.0, fill_rate=1.0, fill_delay=0.5, seed=None,
+                 credentials=None, timeout_rate=0.0, reset_rate=0.0, hang=30.0):
+        self.random = random.Random(seed)
+        self.markets = {}
+        for i in range(markets):
+            token_id = str(self.random.getrandbits(250))
+            self.markets[token_id] = Market(token_id, f"Simulated market {i + 1}?", self.random.uniform(0.2, 0.8))
+        self.latency = latency
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.reset_rate = reset_rate
+        self.hang = hang
+        self.fill_rate = fill_rate
+        self.fill_delay = fill_delay
+        self.credentials = credentials or {}
+        self.trades = {}
+        self.orders = {}
+        self.order_ids = itertools.count(1)
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def fault(self):
+        """Apply simulated latency and pick this request's fault: None, 'error', 'timeout' or 'reset'"""
+        with self.lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        draw = self.random.random()
+        for fault, rate in (('error', self.error_rate), ('timeout', self.timeout_rate), ('reset', self.reset_rate)):
+            if draw < rate:
+                with self.lock:
+                    self.errors += 1
+                return fault
+            draw -= rate
+        return None
+
+    def add_trade(self, trader_address):
+        """Record a fill for the trader and announce it on the activity feed"""
+        market = self.random.choice(list(self.markets.values()))
+        market.step()
+        now = time.time()
+        trade = {
+            'proxyWallet': trader_address,
+            'side': self.random.choice(['BUY', 'SELL']),
+            'asset': market.token_id,
+            'conditionId': '0x' + market.token_id[:64].rjust(64, '0'),
+            'size': round(self.random.uniform(10, 200), 6),
+            'price': round(market.mid, 4),
+            # Fractional seconds keep latency percentiles meaningful
+            'timestamp': now,
+            'title': market.question,
+            'transactionHash': '0x%064x' % self.random.getrandbits(256)
+        }
+        with self.lock:
+            self.trades.setdefault(trader_address.lower(), []).append(trade)
+            listeners = list(self.listeners)
+        for notify in listeners:
+            notify({'topic': 'activity', 'type': 'trades', 'timestamp': int(now * 1000), 'payload': trade})
+        return trade
+
+    def get_trades(self, user, after=None, limit=100, offset=0):
+        with self.lock:
+            trades = list(self.trades.get(user.lower(), []))
+        if after:
+            trades = [t for t in trades if t['timestamp'] > float(after)]
+        return sorted(trades, key=lambda t: t['timestamp'], reverse=True)[offset:offset + limit]
+
+    def verify(self, headers, method, path, body):
+        """Whether the POLY-API-* headers carry a valid HMAC over timestamp + method + path + body"""
+        secret = self.credentials.get(headers.get('POLY-API-KEY'))
+        signature = headers.get('POLY-API-SIGNATURE')
+        if secret is None or signature is None:
+            return False
+        message = (headers.get('POLY-API-TIMESTAMP') or '') + method + path
+        expected = hmac.new(base64.b64decode(secret), message.encode() + body, hashlib.sha256).digest()
+        return hmac.compare_digest(base64.b64encode(expected).decode(), signature)
+
+    def place_order(self, order, owner=None):
+        order_id = f"sim-{next(self.order_ids)}"
+        fills = self.random.random() < self.fill_rate
+        with self.lock:
+            self.orders[order_id] = {
+                'id': order_id,
+                'owner': owner,
+                'status': 'live',
+                'price': order.get('price'),
+                'size': order.get('size'),
+                'fill_at': time.monotonic() + self.fill_delay if fills else None
+            }
+        return {'success': True, 'orderID': order_id, 'status': 'live'}
+
+    def _refresh(self, order):
+        if order['status'] == 'live' and order['fill_at'] is not None and time.monotonic() >= order['fill_at']:
+            order['status'] = 'matched'
+            order['match_time'] = time.time()
+        return {k: v for k, v in order.items() if k != 'fill_at'}
+
+    def get_order(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+            return self._refresh(order) if order else None
+
+    def fills(self, owner, after=None):
+        """The owner's trades, one per filled order, as CLOB /data/trades reports them"""
+        with self.lock:
+            orders = [self._refresh(o) for o in self.orders.values() if o['owner'] == owner]
+        return [{
+            'id': f"trade-{o['id']}",
+            'taker_order_id': o['id'],
+            'status': 'MATCHED',
+            'price': o['price'],
+            'size': o['size'],
+            'match_time': str(int(o['match_time'])),
+            'transaction_hash': '0x%064x' % int(o['id'].rsplit('-', 1)[1])
+        } for o in orders if o['status'] == 'matched' and (not after or o['match_time'] >= float(after))]
+
+    def open_orders(self, owner):
+        with self.lock:
+            orders = [self._refresh(o) for o in self.orders.values() if o['owner'] == owner]
+        return [o for o in orders if o['status'] == 'live']
+
+    def cancel_order(self, order_id):
+        with self.lock:
+            order = self.orders.get(order_id)
+            if order and order['status'] == 'live':
+                order['status'] = 'canceled'
+        return {'canceled': [order_id] if order else [], 'not_canceled': {}}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    exchange = None
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _raw_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        raw_body = self._raw_body() if method in ('POST', 'DELETE') else b''
+        body = json.loads(raw_body) if raw_body else None
+        exchange = self.exchange
+
+        fault = exchange.fault()
+        if fault == 'timeout':
+            time.sleep(exchange.hang)
+        elif fault == 'reset':
+            # Abortive close: the client sees a reset instead of a response
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+            return
+        if fault:
+            return self._send(503, {'error': 'simulated failure'})
+
+        markets = exchange.markets
+        path = url.path
+        authenticated = path == '/order' or path.startswith('/order/') or path.startswith('/data/')
+        if authenticated and exchange.credentials and not exchange.verify(self.headers, method, path, raw_body):
+            return self._send(401, {'error': 'invalid L2 signature'})
+        if method == 'GET' and path == '/trades':
+            return self._send(200, exchange.get_trades(
+                query.get('user', ''), query.get('after'), int(query.get('limit', 100)), int(query.get('offset', 0))
+            ))
+        if method == 'GET' and path.startswith('/markets/'):
+            market = markets.get(path.rsplit('/', 1)[1])
+            if not market:
+                return self._send(404, {'error': 'market not found'})
+            return self._send(200, {'id': market.token_id, 'question': market.question})
+        if method == 'GET' and path == '/book':
+            market = markets.get(query.get('token_id'))
+            return self._send(200, market.book()) if market else self._send(404, {'error': 'no book'})
+        if method == 'POST' and path == '/books':
+            return self._send(200, [markets[b['token_id']].book() for b in body or [] if b.get('token_id') in markets])
+        if method == 'GET' and path in ('/midpoint', '/price'):
+            market = markets.get(query.get('token_id'))
+            key = 'mid' if path == '/midpoint' else 'price'
+            return self._send(200, {key: str(round(market.mid, 4))}) if market else self._send(404, {'error': 'no price'})
+        if method == 'POST' and path == '/midpoints':
+            return self._send(200, {
+                b['token_id']: str(round(markets[b['token_id']].mid, 4)) for b in body or [] if b.get('token_id') in markets
+            })
+        if method == 'POST' and path == '/order':
+            return self._send(200, exchange.place_order(body or {}, self.headers.get('POLY-API-KEY')))
+        if method == 'GET' and path == '/data/trades':
+            return self._send(200, exchange.fills(self.headers.get('POLY-API-KEY'), query.get('after')))
+        if method == 'GET' and path == '/data/orders':
+            return self._send(200, exchange.open_orders(self.headers.get('POLY-API-KEY')))
+        if method == 'GET' and path.startswith('/order/'):
+            order = exchange.get_order(path.rsplit('/', 1)[1])
+            return self._send(200, order) if order else self._send(404, {'error': 'order not found'})
+        if method == 'DELETE' and path == '/order':
+            return self._send(200, exchange.cancel_order((body or {}).get('orderID')))
+        return self._send(404, {'error': f'no route for {method} {path}'})
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+    def log_message(self, *args):
+        pass
+
+
+class Simulator:
+    """REST server on `port` and WebSocket server on `ws_port`, each on a background thread.
+
+    The WebSocket serves the CLOB market channel at /market and the activity
+    feed at any other path.
+    """
+
+    def __init__(self, exchange, host='127.0.0.1', port=8900, ws_port=8901):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.http = None
+        self.loop = None
+
+    @property
+    def urls(self):
+        """Environment overrides pointing config at this simulator"""
+        http_url, ws_url = f"http://{self.host}:{self.port}", f"ws://{self.host}:{self.ws_port}"
+        return {
+            'DATA_API_URL': http_url,
+            'GAMMA_API_URL': http_url,
+            'CLOB_API_URL': http_url,
+            'WS_URL': ws_url,
+            'ACTIVITY_WS_URL': ws_url
+        }
+
+    async def _market_channel(self, ws):
+        async for raw in ws:
+            message = json.loads(raw)
+            new_tokens = [t for t in message.get('assets_ids', []) if t in self.exchange.markets]
+            await ws.send(json.dumps([dict(self.exchange.markets[t].book(), event_type='book') for t in new_tokens]))
+
+    async def _market_ticks(self, ws):
+        while True:
+            await asyncio.sleep(0.5)
+            changes = []
+            for market in self.exchange.markets.values():
+                market.step()
+                book = market.book()
+                changes.append({
+                    'asset_id': market.token_id,
+                    'best_bid': book['bids'][0]['price'],
+                    'best_ask': book['asks'][0]['price']
+                })
+            await ws.send(json.dumps({'event_type': 'price_change', 'price_changes': changes}))
+
+    async def _activity(self, ws):
+        queue = asyncio.Queue()
+        notify = lambda message: self.loop.call_soon_threadsafe(queue.put_nowait, message)
+        with self.exchange.lock:
+            self.exchange.listeners.append(notify)
+        try:
+            while True:
+                await ws.send(json.dumps(await queue.get()))
+        finally:
+            with self.exchange.lock:
+                self.exchange.listeners.remove(notify)
+
+    async def _serve_ws(self, ws):
+        try:
+            if ws.request.path.rstrip('/').endswith('/market'):
+                ticks = asyncio.create_task(self._market_ticks(ws))
+                try:
+                    await self._market_channel(ws)
+                finally:
+                    ticks.cancel()
+            else:
+                await self._activity(ws)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _run_ws(self, ready):
+        self.loop = asyncio.get_running_loop()
+        async with websockets.serve(self._serve_ws, self.host, self.ws_port):
+            ready.set()
+            await asyncio.Future()
+
+    def start(self):
+        handler = type('Handler', (_Handler,), {'exchange': self.exchange})
+        self.http = ThreadingHTTPServer((self.host, self.port), handler)
+        self.http.daemon_threads = True
+        threading.Thread(target=self.http.serve_forever, daemon=True, name='sim-http').start()
+
+        ready = threading.Event()
+        threading.Thread(target=lambda: asyncio.run(self._run_ws(ready)), daemon=True, name='sim-ws').start()
+        ready.wait(5)
+        return self
+
+    def stop(self):
+        if self.http:
+            self.http.shutdown()
+
+
+def generate_activity(exchange, traders, rate, stop, skew=0.0):
+    """Emit trades for random traders at about `rate` per second until `stop` is set.
+
+    With skew > 0 the i-th trader trades in proportion to 1 / i**skew (Zipf),
+    so a few traders are busy and the rest mostly idle.
+    """
+    weights = [1 / (i + 1) ** skew for i in range(len(traders))]
+    while not stop.is_set():
+        exchange.add_trade(random.choices(traders, weights)[0])
+        stop.wait(random.expovariate(rate))
+
+
+def synthetic_traders(count):
+    return ['0x%040x' % (0x5111 + i) for i in range(count)]
+
+
+@click.command()
+@click.option('--port', default=8900, help='REST port')
+@click.option('--ws-port', default=8901, help='WebSocket port')
+@click.option('--traders', default=10, help='Synthetic traders generating activity')
+@click.option('--markets', default=20)
+@click.option('--rate', default=1.0, help='Trades per second across all traders (0 for none)')
+@click.option('--skew', default=0.0, help='Zipf exponent of activity across traders (0 is uniform)')
+@click.option('--latency', default=0.0, help='Mean seconds added to every REST request')
+@click.option('--error-rate', default=0.0, help='Share of REST requests answered with 503')
+@click.option('--timeout-rate', default=0.0, help='Share of REST requests that hang past the client timeout')
+@click.option('--reset-rate', default=0.0, help='Share of REST requests whose connection is reset')
+@click.option('--fill-rate', default=1.0, help='Share of orders that fill')
+@click.option('--fill-delay', default=0.5, help='Seconds before an order fills')
+@click.option('--duration', default=0.0, help='Stop generating trades after this many seconds (0 runs until interrupted)')
+@click.option('--credentials', 'credentials_path', default=None,
+              help='JSON file of {api key: base64 secret}; order endpoints then verify L2 signatures')
+def main(port, ws_port, traders, markets, rate, skew, latency, error_rate, timeout_rate, reset_rate, fill_rate,
+         fill_delay, duration, credentials_path):
+    """Run the simulator until interrupted"""
+    credentials = json.load(open(credentials_path)) if credentials_path else None
+    exchange = Exchange(markets, latency, error_rate, fill_rate, fill_delay, credentials=credentials,
+                        timeout_rate=timeout_rate, reset_rate=reset_rate)
+    simulator = Simulator(exchange, port=port, ws_port=ws_port).start()
+    addresses = synthetic_traders(traders)
+
+    print(f"✓ Simulator on http://127.0.0.1:{port} and ws://127.0.0.1:{ws_port}")
+    for name, url in simulator.urls.items():
+        print(f"  {name}={url}")
+    print(f"Traders: {', '.join(addresses)}")
+
+    stop = threading.Event()
+    if duration:
+        threading.Timer(duration, stop.set).start()
+    try:
+        if rate > 0:
+            generate_activity(exchange, addresses, rate, stop, skew)
+            print("Trade generation finished, serving until interrupted")
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nSimulator stopped")
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Sharding - Splits monitored traders across watcher nodes with consistent hashing"""
+import bisect
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from models import get_db, dialect_insert, WatcherNode
+import config
+
+VIRTUAL_NODES = 64
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring; adding or removing a node only moves that node's share of keys"""
+
+    def __init__(self, nodes, virtual_nodes=VIRTUAL_NODES):
+        self.nodes = frozenset(nodes)
+        self.points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(virtual_nodes)
+        )
+        self.hashes = [h for h, _ in self.points]
+
+    def owner(self, key):
+        if not self.points:
+            return None
+        index = bisect.bisect(self.hashes, _hash(key)) % len(self.points)
+        return self.points[index][1]
+
+
+class ShardMembership:
+    """This node's membership in the watcher fleet.
+
+    A background thread heartbeats the node's row in watcher_nodes; nodes whose
+    heartbeat is older than WATCHER_NODE_TTL are treated as gone, and their
+    traders move to the surviving nodes on the next sweep.
+    """
+
+    def __init__(self, node_id=None):
+        self.node_id = node_id or config.WATCHER_NODE_ID
+        self.ring = HashRing([self.node_id])
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def heartbeat(self):
+        now = datetime.utcnow()
+        stmt = dialect_insert(WatcherNode).values(node_id=self.node_id, heartbeat_at=now, started_at=now)
+        stmt = stmt.on_conflict_do_update(index_elements=['node_id'], set_={'heartbeat_at': now})
+        db = get_db()
+        try:
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self.stopped.wait(config.WATCHER_HEARTBEAT_INTERVAL):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"Heartbeat error: {e}")
+
+    def start(self):
+        """Register this node and start heartbeating (idempotent)"""
+        if self.thread is None:
+            self.heartbeat()
+            self.thread = threading.Thread(target=self._run, daemon=True, name='watcher-heartbeat')
+            self.thread.start()
+            print(f"✓ Joined watcher fleet as {self.node_id}")
+
+    def stop(self):
+        """Leave the fleet so other nodes take over this node's traders right away"""
+        self.stopped.set()
+        db = get_db()
+        try:
+            db.query(WatcherNode).filter(WatcherNode.node_id == self.node_id).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def live_nodes(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=config.WATCHER_NODE_TTL)
+        db = get_db()
+        try:
+            rows = db.query(WatcherNode.node_id).filter(WatcherNode.heartbeat_at >= cutoff).all()
+            return {r[0] for r in rows} | {self.node_id}
+        finally:
+            db.close()
+
+    def owned(self, traders):
+        """The subset of traders this node is responsible for"""
+        self.start()
+        nodes = self.live_nodes()
+        if nodes != self.ring.nodes:
+            print(f"Watcher fleet changed: {len(nodes)} nodes")
+            self.ring = HashRing(nodes)
+        return [t for t in traders if self.ring.owner(t.lower()) == self.node_id]
@@ -0,0 +1,95 @@
+"""Signer Cache - Keeps decrypted follower signing material ready for the executor"""
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from eth_account import Account
+import config
+
+
+class FollowerSigner:
+    """A follower's ready account and L2 credentials with a pre-decoded HMAC key"""
+    __slots__ = ('account', 'api_creds', 'fingerprint', 'expires_at')
+
+    def __init__(self, account, api_creds, fingerprint, expires_at):
+        self.account = account
+        self.api_creds = api_creds
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+
+def credentials_fingerprint(follower):
+    """Digest of the follower's encrypted credentials; changes whenever they are rotated"""
+    parts = [
+        follower.encrypted_private_key,
+        follower.encrypted_api_key,
+        follower.encrypted_api_secret,
+        follower.encrypted_api_passphrase
+    ]
+    return hashlib.sha256('|'.join(p or '' for p in parts).encode()).hexdigest()
+
+
+class SignerCache:
+    """Bounded LRU cache of FollowerSigner entries keyed by follower id.
+
+    Entries expire after `ttl` seconds and are rebuilt when the follower's
+    stored credentials change (e.g. after `admin auth-follower`), so rotated
+    keys take effect on the follower's next order. Evicted entries are only
+    dropped, never modified: clients built from them may still be signing
+    an order on another thread.
+    """
+
+    def __init__(self, decrypt, ttl=None, max_size=None):
+        self.decrypt = decrypt
+        self.ttl = ttl or config.SIGNER_CACHE_TTL
+        self.max_size = max_size or config.SIGNER_CACHE_SIZE
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, follower):
+        """Signer for the follower, decrypting only on a miss"""
+        fingerprint = credentials_fingerprint(follower)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(follower.id)
+            if entry and entry.fingerprint == fingerprint and entry.expires_at > now:
+                self.entries.move_to_end(follower.id)
+                return entry
+
+        entry = self._build(follower, fingerprint, now)
+
+        with self.lock:
+            self._discard(follower.id)
+            self.entries[follower.id] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, follower_id=None):
+        """Drop one follower's entry, or every entry when no id is given"""
+        with self.lock:
+            if follower_id is None:
+                for follower_id in list(self.entries):
+                    self._discard(follower_id)
+            else:
+                self._discard(follower_id)
+
+    def _discard(self, follower_id):
+        self.entries.pop(follower_id, None)
+
+    def _build(self, follower, fingerprint, now):
+        account = Account.from_key(self.decrypt(follower.encrypted_private_key))
+
+        api_creds = None
+        if follower.encrypted_api_key:
+            api_secret = self.decrypt(follower.encrypted_api_secret)
+            api_creds = {
+                'key': self.decrypt(follower.encrypted_api_key),
+                'secret': api_secret,
+                'passphrase': self.decrypt(follower.encrypted_api_passphrase),
+                'hmac_key': base64.b64decode(api_secret)
+            }
+
+        return FollowerSigner(account, api_creds, fingerprint, now + self.ttl)
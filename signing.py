@@ -0,0 +1,121 @@
+"""Signing - Order hashing and ECDSA signing, in parallel on a pool of worker processes"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from eth_abi import encode
+from eth_account.messages import encode_defunct
+from eth_utils import keccak, to_checksum_address
+import config
+
+
+def create_order_hash(token_id, maker, side, size, price, nonce, expiration):
+    """Create order hash for signing (simplified)"""
+    encoded = encode(
+        ['address', 'uint256', 'uint256', 'uint256', 'uint256', 'uint256'],
+        [
+            to_checksum_address(maker),
+            int(token_id, 16) if token_id.startswith('0x') else int(token_id),
+            int(size * 1e6),
+            int(price * 1e6),
+            nonce,
+            expiration
+        ]
+    )
+
+    return keccak(encoded).hex()
+
+
+def sign_order(account, order):
+    """Hash and sign one order payload (create_order_hash keyword arguments); returns (hash, signature)"""
+    order_hash = create_order_hash(**order)
+    signed = account.sign_message(encode_defunct(hexstr=order_hash))
+    return order_hash, signed.signature.hex()
+
+
+def _sign_chunk(chunk):
+    return [sign_order(account, order) for account, order in chunk]
+
+
+def _ready(_):
+    return True
+
+
+class SigningService:
+    """Signs orders on `workers` processes so signing uses every core.
+
+    Hashing and ECDSA signing are CPU-bound and hold the GIL, so on the
+    executor's threads a large fan-out signs one order at a time. With
+    workers=0 orders are signed inline. Accounts are passed to the workers
+    per call over local pipes, already parsed (public key derivation is about
+    half the cost of a signature), and are not kept there.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = config.SIGNING_WORKERS if workers is None else workers
+        self.pool = None
+        self.started = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start the worker processes; call early, before the service starts other threads"""
+        if not self.workers:
+            return
+        with self.lock:
+            if self.pool is not None:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context())
+            list(self.pool.map(_ready, range(self.workers)))
+            self.started = True
+
+    def _context(self):
+        # Forking is only safe on the first start, before the service has other threads;
+        # a restart after a worker died starts clean processes instead
+        methods = multiprocessing.get_all_start_methods()
+        if not self.started and 'fork' in methods:
+            return multiprocessing.get_context('fork')
+        if 'forkserver' in methods:
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['signing'])
+            return context
+        return multiprocessing.get_context('spawn')
+
+    def sign(self, account, order):
+        """Sign one order on a worker, blocking only the calling thread"""
+        if not self.workers:
+            return sign_order(account, order)
+        try:
+            self.start()
+            return self.pool.submit(sign_order, account, order).result()
+        except BrokenProcessPool:
+            self._reset()
+            return sign_order(account, order)
+
+    def sign_batch(self, items):
+        """Sign [(account, order), ...] across all workers, returning results in the same order"""
+        items = list(items)
+        if not self.workers or len(items) < 2:
+            return _sign_chunk(items)
+
+        # A few chunks per worker keeps them evenly loaded without per-order IPC
+        chunk_size = max(1, -(-len(items) // (self.workers * 4)))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        try:
+            self.start()
+            return [result for chunk in self.pool.map(_sign_chunk, chunks) for result in chunk]
+        except BrokenProcessPool:
+            self._reset()
+            return _sign_chunk(items)
+
+    def _reset(self):
+        print("  ⚠ Signing worker died, restarting pool")
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,80 @@
+"""Trade Decoder - Compact typed records from Data API trade pages
+
+Pages are decoded straight from the response bytes with orjson when it is
+installed (falling back to the standard json module), and each trade is
+reduced to the handful of fields the watcher stores.
+"""
+import json
+import time
+from datetime import datetime, timezone
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+
+def parse_timestamp(value):
+    """Epoch seconds from a Data API timestamp (epoch number or ISO string)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return time.time()
+
+
+def utc_datetime(epoch):
+    """Naive UTC datetime, like every other DateTime column"""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+
+
+class TradeRecord:
+    """One trader fill, as stored in the trades table"""
+    __slots__ = ('id', 'market_id', 'market_question', 'side', 'size', 'price', 'timestamp')
+
+    def __init__(self, id, market_id, market_question, side, size, price, timestamp):
+        self.id = id
+        self.market_id = market_id
+        self.market_question = market_question
+        self.side = side
+        self.size = size
+        self.price = price
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data):
+        # Data API field names first, so the usual case is one lookup per field
+        return cls(
+            data.get('transactionHash') or data.get('id') or data.get('transaction_hash'),
+            data.get('asset') or data.get('asset_id') or data.get('market'),
+            data.get('title') or "Unknown",
+            (data.get('side') or '').upper(),
+            float(data.get('size') or 0),
+            float(data.get('price') or 0),
+            parse_timestamp(data.get('timestamp'))
+        )
+
+    def row(self, trader_address, created_at):
+        return {
+            'id': self.id,
+            'trader_address': trader_address,
+            'market_id': self.market_id,
+            'market_question': self.market_question,
+            'side': self.side,
+            'size': self.size,
+            'price': self.price,
+            'timestamp': utc_datetime(self.timestamp),
+            'created_at': created_at
+        }
+
+
+def decode_trades(content):
+    """Records for a page of trades given as raw JSON bytes or text; anything but a list decodes to no trades"""
+    data = loads(content)
+    if not isinstance(data, list):
+        return []
+    return [TradeRecord.from_dict(item) for item in data if isinstance(item, dict)]
@@ -0,0 +1,253 @@
+"""HTTP Transport - Pooled, rate-limited, retrying HTTP access to one Polymarket API"""
+import asyncio
+import importlib.util
+import random
+import threading
+import time
+import httpx
+import config
+from metrics import http_latency
+
+# Statuses worth retrying for idempotent requests
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to an endpoint whose breaker is open"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long the caller must wait"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, possibly borrowing against the future, and return the wait in seconds"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one trial request through after a cool-down"""
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or config.CIRCUIT_RESET_SECONDS
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self.trial_in_flight:
+                self.trial_in_flight = True  # half-open
+                return True
+            return False
+
+    def record(self, success):
+        """Count one request's outcome; None (an abandoned request) only ends a half-open trial"""
+        with self.lock:
+            self.trial_in_flight = False
+            if success is None:
+                return
+            if success:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_timeout else 'open'
+
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter exponential backoff, honouring Retry-After when the server sends it"""
+    if response is not None and response.headers.get('Retry-After'):
+        try:
+            return float(response.headers['Retry-After'])
+        except ValueError:
+            pass
+    return random.uniform(0, min(config.HTTP_RETRY_MAX_DELAY, config.HTTP_RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class _TransportBase:
+    """Shared policy: per-endpoint breakers, a per-API rate limit and a per-request time budget.
+
+    Only GETs are retried; writes such as order placement are sent exactly once.
+    Extra keyword arguments go to the httpx client, e.g. `transport=httpx.MockTransport(handler)`
+    to run against injected faults.
+    """
+
+    def __init__(self, name, base_url, timeout, rate_limit, max_connections, retries=None):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = config.HTTP_RETRIES if retries is None else retries
+        self.bucket = TokenBucket(rate_limit)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def breaker(self, endpoint):
+        with self.lock:
+            if endpoint not in self.breakers:
+                self.breakers[endpoint] = CircuitBreaker()
+            return self.breakers[endpoint]
+
+    def _plan(self, method, path, endpoint):
+        endpoint = endpoint or path
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{self.name} {endpoint} circuit open")
+        attempts = self.retries + 1 if method.upper() == 'GET' else 1
+        deadline = time.monotonic() + self.timeout
+        return breaker, attempts, deadline
+
+    def _observe(self, endpoint, method, status, started):
+        http_latency.observe(time.monotonic() - started, api=self.name, endpoint=endpoint,
+                             method=method.upper(), status=status)
+
+    def _retryable(self, attempt, attempts, deadline, delay):
+        return attempt < attempts - 1 and time.monotonic() + delay < deadline
+
+
+class Transport(_TransportBase):
+    """Synchronous transport over a keep-alive (HTTP/2 when available) connection pool"""
+
+    def __init__(self, name, base_url, timeout, rate_limit, max_connections, retries=None, **client_kwargs):
+        super().__init__(name, base_url, timeout, rate_limit, max_connections, retries)
+        self.client = httpx.Client(
+            http2=config.HTTP2 and HTTP2_AVAILABLE, limits=self.limits, timeout=timeout, **client_kwargs
+        )
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        """Send a request; `endpoint` names the breaker for templated paths such as /order/{id}"""
+        breaker, attempts, deadline = self._plan(method, path, endpoint)
+        # Recorded once per request, not per attempt, and always, so a half-open trial is never left in flight
+        success = None
+        try:
+            for attempt in range(attempts):
+                self.bucket.acquire()
+                remaining = max(0.1, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    response = self.client.request(method, f"{self.base_url}{path}", timeout=remaining, **kwargs)
+                except httpx.TransportError:
+                    self._observe(endpoint or path, method, 'error', started)
+                    delay = backoff_delay(attempt)
+                    if not self._retryable(attempt, attempts, deadline, delay):
+                        success = False
+                        raise
+                    time.sleep(delay)
+                    continue
+
+                self._observe(endpoint or path, method, response.status_code, started)
+                if response.status_code in RETRY_STATUSES:
+                    delay = backoff_delay(attempt, response)
+                    if self._retryable(attempt, attempts, deadline, delay):
+                        time.sleep(delay)
+                        continue
+                success = response.status_code < 500
+                return response
+        finally:
+            breaker.record(success)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncTransport(_TransportBase):
+    """Async counterpart of Transport for the concurrent watcher"""
+
+    def __init__(self, name, base_url, timeout, rate_limit, max_connections, retries=None, **client_kwargs):
+        super().__init__(name, base_url, timeout, rate_limit, max_connections, retries)
+        self.client = httpx.AsyncClient(
+            http2=config.HTTP2 and HTTP2_AVAILABLE, limits=self.limits, timeout=timeout, **client_kwargs
+        )
+
+    async def request(self, method, path, endpoint=None, **kwargs):
+        breaker, attempts, deadline = self._plan(method, path, endpoint)
+        success = None
+        try:
+            for attempt in range(attempts):
+                await self.bucket.acquire_async()
+                remaining = max(0.1, deadline - time.monotonic())
+                started = time.monotonic()
+                try:
+                    response = await self.client.request(method, f"{self.base_url}{path}", timeout=remaining, **kwargs)
+                except httpx.TransportError:
+                    self._observe(endpoint or path, method, 'error', started)
+                    delay = backoff_delay(attempt)
+                    if not self._retryable(attempt, attempts, deadline, delay):
+                        success = False
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+
+                self._observe(endpoint or path, method, response.status_code, started)
+                if response.status_code in RETRY_STATUSES:
+                    delay = backoff_delay(attempt, response)
+                    if self._retryable(attempt, attempts, deadline, delay):
+                        await asyncio.sleep(delay)
+                        continue
+                success = response.status_code < 500
+                return response
+        finally:
+            # Also on cancellation, which would otherwise leave the breaker open for good
+            breaker.record(success)
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def data_transport(cls=Transport, **client_kwargs):
+    return cls('data', config.DATA_API_URL, config.DATA_API_TIMEOUT, config.DATA_API_RATE_LIMIT,
+               config.DATA_API_MAX_CONNECTIONS, **client_kwargs)
+
+
+def gamma_transport(cls=Transport, **client_kwargs):
+    return cls('gamma', config.GAMMA_API_URL, config.GAMMA_API_TIMEOUT, config.GAMMA_API_RATE_LIMIT,
+               config.GAMMA_API_MAX_CONNECTIONS, **client_kwargs)
+
+
+def clob_transport(cls=Transport, **client_kwargs):
+    return cls('clob', config.CLOB_API_URL, config.CLOB_API_TIMEOUT, config.CLOB_API_RATE_LIMIT,
+               config.CLOB_API_MAX_CONNECTIONS, **client_kwargs)
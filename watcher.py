@@ -1,9 +1,20 @@
 """Watcher Service - Monitors trader wallets and detects new trades"""
+import asyncio
+import json
+import threading
 import time
-from datetime import datetime, timedelta
-from models import get_db, Follow, Trade
-from polymarket_client import PolymarketClient
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import websockets
+from sqlalchemy import func
+from models import get_db, dialect_insert, insert_ignore, Follow, Trade, TraderWatermark
+from polymarket_client import PolymarketClient, AsyncPolymarketClient
+from sharding import ShardMembership
+from scheduler import PollScheduler, load_activity
+from trade_decoder import TradeRecord, loads, utc_datetime
 import config
+import events
+import metrics
 
 print("🔍 Watcher Service Starting...")
 
@@ -18,67 +29,182 @@ def get_traders_to_monitor():
     finally:
         db.close()
 
+membership = ShardMembership()
+
+trades_detected = metrics.registry.counter('pmct_trades_detected_total', 'New trader fills stored by the watcher')
+
+def get_owned_traders():
+    """Followed traders assigned to this watcher node"""
+    owned = membership.owned(get_traders_to_monitor())
+    ingestor.retain(owned)
+    return owned
+
+def utc_epoch(dt):
+    """Epoch seconds of a naive UTC datetime"""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def persist_watermark(trader_address, last_timestamp):
+    """Upsert a trader's watermark, never moving it backwards"""
+    stmt = dialect_insert(TraderWatermark).values(
+        trader_address=trader_address,
+        last_timestamp=last_timestamp,
+        updated_at=datetime.utcnow()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['trader_address'],
+        set_={'last_timestamp': stmt.excluded.last_timestamp, 'updated_at': stmt.excluded.updated_at},
+        where=TraderWatermark.last_timestamp < stmt.excluded.last_timestamp
+    )
+
+
+class TradeIngestor:
+    """Batch trade ingestion with in-memory per-trader watermarks.
+    
+    Each trader's watermark (timestamp of their newest stored trade) is loaded
+    once and then advanced in memory, and recently written ids are remembered,
+    so a page of trades costs one INSERT ... ON CONFLICT DO NOTHING and one
+    commit instead of a lookup and commit per trade.
+    """
+    
+    def __init__(self, seen_limit=50000, channel=None):
+        self.channel = channel
+        self.watermarks = {}
+        self.seen_ids = OrderedDict()
+        self.seen_limit = seen_limit
+        self.lock = threading.Lock()
+    
+    def load_watermarks(self, traders):
+        """Load watermarks for traders not yet tracked.
+        
+        Persisted watermarks come first, so a trader handed over from another
+        watcher node resumes where that node stopped; traders without one fall
+        back to their newest stored trade.
+        """
+        missing = [t.lower() for t in traders if t.lower() not in self.watermarks]
+        if not missing:
+            return
+        
+        db = get_db()
+        try:
+            rows = db.query(TraderWatermark.trader_address, TraderWatermark.last_timestamp).filter(
+                TraderWatermark.trader_address.in_(missing)
+            ).all()
+            found = {r[0] for r in rows}
+            unpersisted = [t for t in missing if t not in found]
+            if unpersisted:
+                rows += db.query(Trade.trader_address, func.max(Trade.timestamp)).filter(
+                    Trade.trader_address.in_(unpersisted)
+                ).group_by(Trade.trader_address).all()
+        finally:
+            db.close()
+        
+        default = utc_epoch(datetime.utcnow() - timedelta(hours=1))
+        with self.lock:
+            for trader_address in missing:
+                self.watermarks.setdefault(trader_address, default)
+            for trader_address, last_timestamp in rows:
+                self.watermarks[trader_address] = utc_epoch(last_timestamp)
+    
+    def retain(self, traders):
+        """Forget watermarks of traders this node no longer owns, so they are reloaded if it gets them back"""
+        keep = {t.lower() for t in traders}
+        with self.lock:
+            for trader_address in list(self.watermarks):
+                if trader_address not in keep:
+                    del self.watermarks[trader_address]
+    
+    def after_timestamp(self, trader_address):
+        """Timestamp to fetch trades after for this trader"""
+        trader_address = trader_address.lower()
+        if trader_address not in self.watermarks:
+            self.load_watermarks([trader_address])
+        return self.watermarks[trader_address]
+    
+    def ingest(self, db, trader_address, records, after=None, advance=True):
+        """Write a page of TradeRecords in one statement and return how many were new.
+        
+        Polled pages drop trades older than the watermark they were fetched
+        after; streamed events pass after=None since they can arrive out of
+        order. Polls that page back pass advance=False and call advance() once
+        every page is stored, so a poll that fails part-way is retried from
+        the old watermark.
+        """
+        trader_address = trader_address.lower()
+        created_at = datetime.utcnow()
+        
+        rows = {}
+        for record in records:
+            if not record.id or record.id in rows or record.id in self.seen_ids:
+                continue
+            if after is not None and record.timestamp < after:
+                continue
+            rows[record.id] = record.row(trader_address, created_at)
+        
+        if not rows:
+            return 0
+        
+        result = db.execute(
+            insert_ignore(Trade, ['id']).values(list(rows.values())).returning(Trade.id)
+        )
+        new_ids = {r[0] for r in result}
+        
+        if advance:
+            newest = max(row['timestamp'] for row in rows.values())
+            db.execute(persist_watermark(trader_address, newest))
+        
+        if new_ids and self.channel:
+            self.channel.publish(db, new_ids)
+        db.commit()
+        
+        with self.lock:
+            for trade_id in rows:
+                self.seen_ids[trade_id] = True
+            while len(self.seen_ids) > self.seen_limit:
+                self.seen_ids.popitem(last=False)
+            if advance:
+                self._advance(trader_address, newest)
+        
+        for trade_id in new_ids:
+            row = rows[trade_id]
+            metrics.observe_stage('detect', row['timestamp'], row['created_at'])
+            trades_detected.inc()
+            trade_time_str = row['timestamp'].strftime('%H:%M:%S')
+            print(f"✓ New trade detected [{trade_time_str}]: {trader_address[:8]}... {row['side']} {row['size']}@{row['price']} - {row['market_question'][:50]}")
+        
+        return len(new_ids)
+    
+    def _advance(self, trader_address, newest):
+        self.watermarks[trader_address] = max(self.watermarks.get(trader_address, 0), utc_epoch(newest))
+    
+    def advance(self, db, trader_address, newest):
+        """Move a trader's watermark to `newest` (epoch seconds) after a paged poll"""
+        trader_address = trader_address.lower()
+        newest = utc_datetime(newest)
+        db.execute(persist_watermark(trader_address, newest))
+        db.commit()
+        with self.lock:
+            self._advance(trader_address, newest)
+
+
+ingestor = TradeIngestor()
+
 def check_trader_trades(trader_address, client):
-    """Check for new trades from a trader and save to DB"""
+    """Check for new trades from a trader and save to DB, one page at a time"""
     db = get_db()
     try:
-        last_trade = db.query(Trade).filter(
-            Trade.trader_address == trader_address
-        ).order_by(Trade.timestamp.desc()).first()
+        after_timestamp = ingestor.after_timestamp(trader_address)
         
-        after_timestamp = None
-        if last_trade:
-            after_timestamp = last_trade.timestamp.timestamp()
-        else:
-            after_timestamp = (datetime.utcnow() - timedelta(hours=1)).timestamp()
+        total_new = 0
+        newest = None
+        for page in client.iter_trades(trader_address, after_timestamp):
+            total_new += ingestor.ingest(db, trader_address, page, after_timestamp, advance=False)
+            newest = max(newest or 0, max(record.timestamp for record in page))
         
-        trades = client.get_trades(trader_address, after_timestamp)
+        if newest is not None and newest > after_timestamp:
+            ingestor.advance(db, trader_address, newest)
         
-        if not trades:
-            return 0
-        
-        new_count = 0
-        for trade_data in trades:
-            trade_id = trade_data.get('id') or trade_data.get('transaction_hash') or trade_data.get('transactionHash')
-            
-            existing = db.query(Trade).filter(Trade.id == trade_id).first()
-            if existing:
-                continue
-            
-            market_id = trade_data.get('asset_id') or trade_data.get('market') or trade_data.get('asset')
-            side = trade_data.get('side', '').upper()
-            size = float(trade_data.get('size', 0))
-            price = float(trade_data.get('price', 0))
-            timestamp_val = trade_data.get('timestamp')
-            
-            # Convert various timestamp formats to datetime
-            if isinstance(timestamp_val, (int, float)):
-                timestamp = datetime.fromtimestamp(timestamp_val)
-            elif isinstance(timestamp_val, str):
-                timestamp = datetime.fromisoformat(timestamp_val.replace('Z', '+00:00'))
-            else:
-                timestamp = datetime.utcnow()
-            
-            market_question = trade_data.get('title') or "Unknown"
-            
-            trade = Trade(
-                id=trade_id,
-                trader_address=trader_address.lower(),
-                market_id=market_id,
-                market_question=market_question,
-                side=side,
-                size=size,
-                price=price,
-                timestamp=timestamp
-            )
-            db.add(trade)
-            db.commit()
-            
-            trade_time_str = timestamp.strftime('%H:%M:%S')
-            print(f"✓ New trade detected [{trade_time_str}]: {trader_address[:8]}... {side} {size}@{price} - {market_question[:50]}")
-            new_count += 1
-        
-        return new_count
+        return total_new
         
     except Exception as e:
         print(f"Error checking trader {trader_address[:8]}: {e}")
@@ -87,21 +213,178 @@ def check_trader_trades(trader_address, client):
     finally:
         db.close()
 
-def main():
+def _save_trades(trader_address, records):
+    db = get_db()
+    try:
+        return ingestor.ingest(db, trader_address, records)
+    except Exception as e:
+        print(f"Error saving trades for {trader_address[:8]}: {e}")
+        db.rollback()
+        return 0
+    finally:
+        db.close()
+
+def _with_db(fn, *args):
+    db = get_db()
+    try:
+        return fn(db, *args)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+async def check_trader_trades_async(trader_address, client, semaphore):
+    """Async variant of check_trader_trades; DB work runs in a worker thread"""
+    async with semaphore:
+        try:
+            after_timestamp = ingestor.after_timestamp(trader_address)
+            
+            total_new = 0
+            newest = None
+            async for page in client.iter_trades(trader_address, after_timestamp):
+                total_new += await asyncio.to_thread(
+                    _with_db, ingestor.ingest, trader_address, page, after_timestamp, False
+                )
+                newest = max(newest or 0, max(record.timestamp for record in page))
+            
+            if newest is not None and newest > after_timestamp:
+                await asyncio.to_thread(_with_db, ingestor.advance, trader_address, newest)
+            
+            return total_new
+        except Exception as e:
+            print(f"Error checking trader {trader_address[:8]}: {e}")
+            return 0
+
+async def sweep_async(traders, client, semaphore):
+    """Poll every trader concurrently and return the number of new trades"""
+    await asyncio.to_thread(ingestor.load_watermarks, traders)
+    results = await asyncio.gather(*[
+        check_trader_trades_async(trader, client, semaphore) for trader in traders
+    ])
+    return sum(results)
+
+def load_schedule():
+    """Owned traders and their recent activity, with their watermarks loaded; only touches the database"""
+    traders = get_owned_traders()
+    ingestor.load_watermarks(traders)
+    return traders, load_activity(traders)
+
+def update_schedule(scheduler, schedule=None):
+    """Refresh the owned trader set and their poll intervals"""
+    traders, activity = schedule or load_schedule()
+    scheduler.update(traders, activity)
+    print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Monitoring {scheduler.describe()}")
+
+async def scheduled_async(client, semaphore):
+    """Poll each trader when the scheduler says it is due, up to WATCHER_CONCURRENCY at once"""
+    scheduler = PollScheduler()
+    in_flight = set()
+    
+    async def poll(trader):
+        new_trades = await check_trader_trades_async(trader, client, semaphore)
+        scheduler.completed(trader, new_trades)
+    
+    while True:
+        try:
+            if scheduler.needs_update():
+                # Queries in a thread; the scheduler itself is only touched on the event loop,
+                # where poll tasks report back to it
+                update_schedule(scheduler, await asyncio.to_thread(load_schedule))
+            
+            delay = scheduler.delay()
+            if delay > 0:
+                await asyncio.sleep(min(delay, config.WATCHER_POLL_INTERVAL))
+                continue
+            
+            task = asyncio.create_task(poll(scheduler.pop()))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            
+        except Exception as e:
+            print(f"Watcher error: {e}")
+            await asyncio.sleep(config.WATCHER_POLL_INTERVAL)
+
+async def main_async(channel=None):
+    """Async watcher loop: polls all traders concurrently, bounded by WATCHER_CONCURRENCY"""
+    client = AsyncPolymarketClient()
+    ingestor.channel = channel or events.get_channel()
+    semaphore = asyncio.Semaphore(config.WATCHER_CONCURRENCY)
+    
+    try:
+        if config.WATCHER_ADAPTIVE:
+            await scheduled_async(client, semaphore)
+        while True:
+            try:
+                traders = await asyncio.to_thread(get_owned_traders)
+                
+                if not traders:
+                    print("No traders to monitor. Waiting...")
+                    await asyncio.sleep(config.WATCHER_POLL_INTERVAL)
+                    continue
+                
+                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Monitoring {len(traders)} traders...")
+                
+                started = time.monotonic()
+                total_new = await sweep_async(traders, client, semaphore)
+                
+                if total_new > 0:
+                    print(f"✓ Found {total_new} new trades")
+                print(f"Sweep took {time.monotonic() - started:.2f}s")
+                
+                await asyncio.sleep(config.WATCHER_POLL_INTERVAL)
+                
+            except Exception as e:
+                print(f"Watcher error: {e}")
+                await asyncio.sleep(config.WATCHER_POLL_INTERVAL)
+    finally:
+        await client.aclose()
+
+def main_scheduled(client):
+    """Poll one trader at a time, each when the scheduler says it is due"""
+    scheduler = PollScheduler()
+    
+    while True:
+        try:
+            if scheduler.needs_update():
+                update_schedule(scheduler)
+            
+            delay = scheduler.delay()
+            if delay > 0:
+                time.sleep(min(delay, config.WATCHER_POLL_INTERVAL))
+                continue
+            
+            trader = scheduler.pop()
+            scheduler.completed(trader, check_trader_trades(trader, client))
+            
+        except KeyboardInterrupt:
+            print("\n\nWatcher stopped by user")
+            break
+        except Exception as e:
+            print(f"Watcher error: {e}")
+            time.sleep(config.WATCHER_POLL_INTERVAL)
+
+def main(channel=None):
     """Main watcher loop"""
     client = PolymarketClient()
+    ingestor.channel = channel or events.get_channel()
+    
+    if config.WATCHER_ADAPTIVE:
+        return main_scheduled(client)
     
     while True:
         try:
-            traders = get_traders_to_monitor()
+            traders = get_owned_traders()
             
             if not traders:
                 print("No traders to monitor. Waiting...")
-                time.sleep(60)
+                time.sleep(config.WATCHER_POLL_INTERVAL)
                 continue
             
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Monitoring {len(traders)} traders...")
             
+            ingestor.load_watermarks(traders)
+            
             total_new = 0
             for trader in traders:
                 new_trades = check_trader_trades(trader, client)
@@ -119,5 +402,99 @@ def main():
             print(f"Watcher error: {e}")
             time.sleep(config.WATCHER_POLL_INTERVAL)
 
+def _subscribe_message():
+    return json.dumps({
+        'action': 'subscribe',
+        'subscriptions': [{'topic': 'activity', 'type': 'trades'}]
+    })
+
+async def handle_stream_message(raw, traders):
+    """Save a streamed trade event if it belongs to a monitored trader"""
+    try:
+        message = loads(raw)
+    except (TypeError, ValueError):
+        return 0
+    
+    if not isinstance(message, dict) or message.get('topic') != 'activity':
+        return 0
+    
+    trade_data = message.get('payload') or {}
+    trader_address = (trade_data.get('proxyWallet') or trade_data.get('user') or '').lower()
+    if trader_address not in traders:
+        return 0
+    
+    return await asyncio.to_thread(_save_trades, trader_address, [TradeRecord.from_dict(trade_data)])
+
+async def refresh_traders(traders, client, semaphore):
+    """Keep the monitored trader set current and backfill newly followed or assigned traders"""
+    while True:
+        await asyncio.sleep(config.WATCHER_POLL_INTERVAL)
+        try:
+            current = set(await asyncio.to_thread(get_owned_traders))
+            added = current - traders
+            traders.intersection_update(current)
+            traders.update(current)
+            if added:
+                print(f"Now monitoring {len(added)} more traders")
+                await sweep_async(added, client, semaphore)
+        except Exception as e:
+            print(f"Error refreshing traders: {e}")
+
+async def stream_main(channel=None):
+    """Streaming watcher: saves trades from the activity WebSocket as they arrive.
+    
+    After every (re)connect, trades missed while disconnected are backfilled
+    through the REST path, starting from each trader's last stored trade.
+    """
+    client = AsyncPolymarketClient()
+    ingestor.channel = channel or events.get_channel()
+    semaphore = asyncio.Semaphore(config.WATCHER_CONCURRENCY)
+    traders = set(await asyncio.to_thread(get_owned_traders))
+    refresher = asyncio.create_task(refresh_traders(traders, client, semaphore))
+    backoff = 1
+    
+    try:
+        while True:
+            try:
+                async with websockets.connect(config.ACTIVITY_WS_URL, ping_interval=20) as ws:
+                    await ws.send(_subscribe_message())
+                    print(f"✓ Subscribed to trade stream ({len(traders)} traders)")
+                    backoff = 1
+                    
+                    # Subscribe first, then backfill, so no window is left uncovered
+                    filled = await sweep_async(list(traders), client, semaphore)
+                    if filled > 0:
+                        print(f"✓ Backfilled {filled} trades")
+                    
+                    async for raw in ws:
+                        await handle_stream_message(raw, traders)
+                    
+                    print(f"Trade stream closed, reconnecting in {backoff}s...")
+                    
+            except (websockets.ConnectionClosed, OSError) as e:
+                print(f"Trade stream disconnected ({e}), reconnecting in {backoff}s...")
+            except Exception as e:
+                print(f"Trade stream error: {e}, reconnecting in {backoff}s...")
+            
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+    finally:
+        refresher.cancel()
+        await client.aclose()
+
+def run(channel=None):
+    """Start the watcher in the configured WATCHER_MODE"""
+    metrics.start_server(config.WATCHER_METRICS_PORT)
+    try:
+        if config.WATCHER_MODE in ('async', 'stream'):
+            try:
+                asyncio.run(stream_main(channel) if config.WATCHER_MODE == 'stream' else main_async(channel))
+            except KeyboardInterrupt:
+                print("\n\nWatcher stopped by user")
+        else:
+            main(channel)
+    finally:
+        membership.stop()
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    run()
\ No newline at end of file